@@ -0,0 +1,52 @@
+import argparse
+import sys
+
+from benchmark.suite import compare, load, run, save
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="benchmark",
+        description="Benchmarks of the Spirograph core hot paths.",
+    )
+    parser.add_argument(
+        "mode",
+        choices=["run", "compare"],
+        help="Record a baseline or compare against one.",
+    )
+    parser.add_argument(
+        "baseline",
+        help="JSON baseline file written by run and read by compare.",
+    )
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=lambda s: [int(float(n)) for n in s.split(",")],
+        default=None,
+        help="Comma separated sample sizes (default: 1e3,...,1e7).",
+    )
+    parser.add_argument(
+        "-k",
+        "--pattern",
+        default="",
+        help="Only run the benchmarks whose name contains the pattern.",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative regression threshold used by compare.",
+    )
+    args = parser.parse_args()
+
+    if args.mode == "run":
+        save(args.baseline, run(args.sizes, args.pattern))
+    else:
+        regressions = compare(
+            load(args.baseline),
+            run(args.sizes, args.pattern),
+            args.threshold,
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
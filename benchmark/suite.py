@@ -0,0 +1,233 @@
+"""Module containing the benchmarks of the core hot paths."""
+
+import json
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable
+
+import numpy as np
+
+from project.core.epicycle import Epicycle
+from project.core.geometry import Spirograph, Transform
+from project.core.svg_encoder import SVGEncoder
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+CIRCLES = [3, 30, 300]
+
+
+def spirograph_trajectory(n: int, method: str = "direct") -> Callable[[], Any]:
+    t = Spirograph.angles(0, 20 * np.pi, n)
+    return lambda: Spirograph.trajectory(0.8, 0.3, t, method)
+
+
+def epicycle_time(n: int, m: int, method: str = "auto") -> Callable[[], Any]:
+    rng = np.random.default_rng(0)
+    e = Epicycle(method=method)
+    e.add_circles(
+        list(rng.random(m) / m),
+        list(rng.integers(-50, 50, m)),
+        list(rng.random(m) * 2 * np.pi),
+    )
+    t = np.linspace(0, 2 * np.pi, n)
+    empty = np.empty((0,))
+
+    def run() -> None:
+        # Reset first, assigning the same time again would be a no-op
+        e.time = empty
+        e.time = t
+
+    return run
+
+
+def transform_chain(n: int) -> Callable[[], Any]:
+    a = Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 20 * np.pi, n))
+    return lambda: (
+        Transform(a)
+        .translate(1, 1)
+        .rotate_p(0.3, 1, 1)
+        .scale_p(2, 2, 1, 1)
+        .scale(500, 500)
+        .a
+    )
+
+
+def svg_encode_path(n: int) -> Callable[[], Any]:
+    a = Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 20 * np.pi, n))
+    return lambda: SVGEncoder.encode_path(a)
+
+
+def cases(sizes: list[int]) -> dict[str, tuple[int, Callable]]:
+    """Return the benchmark cases as name: (samples, setup)."""
+    out: dict[str, tuple[int, Callable]] = {}
+    for n in sizes:
+        out[f"spirograph_trajectory[n={n}]"] = (
+            n,
+            lambda n=n: spirograph_trajectory(n),
+        )
+        out[f"spirograph_recurrence[n={n}]"] = (
+            n,
+            lambda n=n: spirograph_trajectory(n, "recurrence"),
+        )
+        for m in CIRCLES:
+            out[f"epicycle_time[n={n},m={m}]"] = (
+                n,
+                lambda n=n, m=m: epicycle_time(n, m),
+            )
+            out[f"epicycle_direct[n={n},m={m}]"] = (
+                n,
+                lambda n=n, m=m: epicycle_time(n, m, "direct"),
+            )
+            out[f"epicycle_recurrence[n={n},m={m}]"] = (
+                n,
+                lambda n=n, m=m: epicycle_time(n, m, "recurrence"),
+            )
+        out[f"transform_chain[n={n}]"] = (n, lambda n=n: transform_chain(n))
+        out[f"svg_encode_path[n={n}]"] = (n, lambda n=n: svg_encode_path(n))
+    return out
+
+
+def measure(
+    setup: Callable[[], Callable[[], Any]],
+    samples: int,
+    repeat: int = 3,
+    min_time: float = 1.0,
+) -> dict[str, float]:
+    """
+    Measure the best wall time and the peak memory of a benchmark.
+
+    Parameters
+    ----------
+    setup : Callable
+        Function returning the callable to benchmark.
+    samples : int
+        Number of samples processed by each call.
+    repeat : int
+        Maximum number of timed calls, the best one is kept.
+    min_time : float
+        No more calls are timed once this many seconds are spent.
+
+    Returns
+    -------
+    dict[str, float] : Samples, best time in seconds, throughput in
+    samples per second and peak traced memory in bytes.
+    """
+    func = setup()
+    best = np.inf
+    total = 0.0
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - t_0
+        best = min(best, elapsed)
+        total += elapsed
+        if total > min_time:
+            break
+
+    # Tracing slows down allocations, so memory is measured separately
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "samples": samples,
+        "time": best,
+        "throughput": samples / best,
+        "peak_bytes": peak,
+    }
+
+
+def run(
+    sizes: list[int] | None = None,
+    pattern: str = "",
+    log: Callable[[str], Any] = print,
+) -> dict[str, Any]:
+    """
+    Run the benchmark suite.
+
+    Parameters
+    ----------
+    sizes : list[int] | None
+        Sample sizes, by default from 1e3 to 1e7.
+    pattern : str
+        Only run the benchmarks whose name contains the pattern.
+    log : Callable
+        Function called with a line of report for each benchmark.
+
+    Returns
+    -------
+    dict[str, Any] : Environment metadata and results by benchmark name.
+    """
+    results = {}
+    for name, (samples, setup) in cases(sizes or SIZES).items():
+        if pattern not in name:
+            continue
+        results[name] = measure(setup, samples)
+        log(format_result(name, results[name]))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+
+
+def format_result(name: str, result: dict[str, float]) -> str:
+    return (
+        f"{name:<40} {result['time'] * 1000:>10.2f} ms "
+        f"{result['throughput']:>12.3e} samples/s "
+        f"{result['peak_bytes'] / 2**20:>10.1f} MiB"
+    )
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.1
+) -> list[str]:
+    """
+    Compare benchmark results against a baseline.
+
+    Parameters
+    ----------
+    baseline : dict[str, Any]
+        Baseline results, as returned by `run`.
+    current : dict[str, Any]
+        Current results, as returned by `run`.
+    threshold : float
+        Relative throughput loss or peak memory growth
+        above which a benchmark is flagged.
+
+    Returns
+    -------
+    list[str] : Description of the regressions.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        base = baseline["results"][name]
+        speed = result["throughput"] / base["throughput"]
+        memory = result["peak_bytes"] / max(base["peak_bytes"], 1)
+        if speed < 1 - threshold:
+            regressions.append(
+                f"{name}: throughput {speed:.2f}x of the baseline"
+            )
+        if memory > 1 + threshold:
+            regressions.append(
+                f"{name}: peak memory {memory:.2f}x of the baseline"
+            )
+    return regressions
+
+
+def save(path: str, results: dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -1,10 +1,6 @@
 import argparse
 import sys
 
-from PySide6.QtWidgets import QApplication
-
-from project.gui.main_window import MainWindow
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         prog="Spirograph",
@@ -17,10 +13,50 @@ if __name__ == "__main__":
         action="store_true",
         help="Use the command line version of the application.",
     )
+    parser.add_argument(
+        "jobs",
+        nargs="?",
+        help="JSON or CSV job file rendered by the command line version.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Render jobs even if their output is up to date.",
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        nargs="?",
+        const="time",
+        choices=["time", "memory"],
+        help="Report the time spent in each stage of the rendering, "
+        "and their memory peak with 'memory' (slower).",
+    )
     args = parser.parse_args()
     if args.no_gui:
-        print("Command line version not implemented yet.")
+        # The command line version must not load the GUI stack
+        from project.cli import run
+
+        if args.jobs is None:
+            parser.error("a job file is required with --no-gui")
+        sys.exit(run(args.jobs, args.workers, args.force, args.profile))
     else:
+        from PySide6.QtWidgets import QApplication
+
+        from project.core import profiling
+        from project.gui.main_window import MainWindow
+
+        if args.profile:
+            profiling.enable(memory=args.profile == "memory")
+
         prog = QApplication(sys.argv)
         main_window = MainWindow()
         main_window.show()
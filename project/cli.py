@@ -0,0 +1,268 @@
+"""Module for the command line version of the application."""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any
+
+import numpy as np
+
+from project.core import profiling
+from project.core.epicycle import Epicycle
+from project.core.geometry import Spirograph
+from project.core.raster import Rasterizer
+from project.core.svg_encoder import SVGEncoder
+
+DEFAULTS: dict[str, Any] = {
+    "type": "spirograph",
+    "t_start": 0.0,
+    "t_end": 2 * np.pi,
+    "steps": 1000,
+    "size": 10.0,
+    "padding": 0.5,
+    "width": 256,
+}
+FLOATS = ("l", "k", "t_start", "t_end", "size", "padding", "bezier")
+LISTS = ("radius", "speed", "angle_i")
+
+
+def load_jobs(path: str) -> list[dict[str, Any]]:
+    """
+    Read a job file.
+
+    A JSON file contains a list of jobs (or an object with a "jobs"
+    list), a CSV file contains one job per row. Each job has a "type"
+    ("spirograph" with "l" and "k", or "epicycle" with "radius",
+    "speed" and "angle_i" lists, space separated in CSV files),
+    optional "t_start", "t_end", "steps", "size", "padding" and
+    "decimals" (compact path encoding), and an "output" path relative
+    to the job file, compressed if it ends with .svgz. Outputs ending
+    with .png are rasterized as "width" pixels wide thumbnails. SVG
+    outputs of jobs with a "bezier" tolerance are written as cubic
+    Bezier curves fitted within it (relative to the unit circle of
+    the spirographs) instead of "steps" straight segments.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON or CSV job file.
+
+    Returns
+    -------
+    list[dict[str, Any]] : Normalized jobs.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows: list[dict[str, Any]] = [
+                {key: value for key, value in row.items() if value}
+                for row in csv.DictReader(f)
+            ]
+        else:
+            data = json.load(f)
+            rows = data["jobs"] if isinstance(data, dict) else data
+
+    root = os.path.dirname(os.path.abspath(path))
+    return [parse_job(row, root) for row in rows]
+
+
+def parse_job(row: dict[str, Any], root: str = "") -> dict[str, Any]:
+    """Validate a job and fill in its default values."""
+    job = {**DEFAULTS, **row}
+    if "output" not in job:
+        raise ValueError(f"Job {row} has no output path.")
+    if job["type"] == "spirograph":
+        required: tuple[str, ...] = ("l", "k")
+    elif job["type"] == "epicycle":
+        required = LISTS
+    else:
+        raise ValueError(f"Unknown job type {job['type']!r}.")
+    for key in required:
+        if key not in job:
+            raise ValueError(f"Job {row} is missing {key!r}.")
+
+    for key in FLOATS:
+        if key in job:
+            job[key] = float(job[key])
+    for key in LISTS:
+        if isinstance(job.get(key), str):
+            job[key] = [float(value) for value in job[key].split()]
+    job["steps"] = int(float(job["steps"]))
+    job["width"] = int(float(job["width"]))
+    if job.get("decimals") is not None:
+        job["decimals"] = int(float(job["decimals"]))
+        if job["decimals"] < 0:
+            raise ValueError(f"Job {row} has a negative 'decimals'.")
+    job["output"] = os.path.join(root, job["output"])
+    return job
+
+
+def render_job(
+    job: dict[str, Any], profile: str | None = None
+) -> dict[str, Any]:
+    """
+    Render a job to its SVG or PNG output file.
+
+    Parameters
+    ----------
+    job : dict[str, Any]
+        Normalized job, see `load_jobs`.
+    profile : str | None
+        Record the time spent in each stage of the rendering,
+        and their memory peak too if "memory".
+
+    Returns
+    -------
+    dict[str, Any] : Output path, number of samples, rendering time
+    in seconds and, if profiled, the statistics of the stages.
+    """
+    if profile:
+        # Worker processes are reused, only this job is reported
+        profiling.enable(memory=profile == "memory")
+        profiling.reset()
+    t_0 = time.perf_counter()
+    output = job["output"]
+    png = output.lower().endswith(".png")
+    # Bezier curves are only written to SVG outputs
+    bezier = job.get("bezier") is not None and not png
+    ti, tf = job["t_start"], job["t_end"]
+    if job["type"] == "spirograph":
+        if bezier:
+            a = Spirograph.bezier(job["l"], job["k"], ti, tf, job["bezier"])
+        else:
+            t = Spirograph.angles(ti, tf, job["steps"])
+            a = Spirograph.trajectory(job["l"], job["k"], t)
+    else:
+        e = Epicycle(lean=True)
+        e.add_circles(job["radius"], job["speed"], job["angle_i"])
+        if bezier:
+            a = e.bezier(ti, tf, job["bezier"])
+        else:
+            e.time = Spirograph.angles(ti, tf, job["steps"])
+            a = e.trajectory
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    # Write to a temporary file first so that an interrupted job
+    # never leaves an output that looks up to date
+    if png:
+        coverage = Rasterizer.rasterize(
+            a,
+            job["width"],
+            extent=None if job["type"] == "epicycle" else (-1, 1, -1, 1),
+        )
+        Rasterizer.write_png(Rasterizer.grayscale(coverage), output + ".tmp")
+    else:
+        SVGEncoder.write_path(
+            a,
+            output + ".tmp",
+            job["size"],
+            job["padding"],
+            decimals=job.get("decimals"),
+            compress=output.lower().endswith(".svgz"),
+            bezier=bezier,
+        )
+    os.replace(output + ".tmp", output)
+    with open(digest_path(output), "w", encoding="utf-8") as f:
+        f.write(job_digest(job))
+    result = {
+        "output": output,
+        "samples": a.shape[1],
+        "time": time.perf_counter() - t_0,
+    }
+    if profile:
+        result["profile"] = profiling.stats()
+    return result
+
+
+def job_digest(job: dict[str, Any]) -> str:
+    """Hash of the parameters of a normalized job."""
+    return hashlib.sha1(
+        json.dumps(job, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def digest_path(output: str) -> str:
+    """Path of the file storing the digest of the job of an output."""
+    head, tail = os.path.split(output)
+    return os.path.join(head, f".{tail}.sha1")
+
+
+def is_up_to_date(job: dict[str, Any]) -> bool:
+    """
+    Check if the output of a job exists and was rendered
+    with the same parameters.
+    """
+    if not os.path.exists(job["output"]):
+        return False
+    try:
+        with open(digest_path(job["output"]), encoding="utf-8") as f:
+            return f.read() == job_digest(job)
+    except OSError:
+        return False
+
+
+def run(
+    path: str,
+    workers: int | None = None,
+    force: bool = False,
+    profile: str | None = None,
+) -> int:
+    """
+    Render all the jobs of a job file across a process pool.
+
+    The jobs whose output was already rendered with the same
+    parameters are skipped, their digest is stored in a hidden
+    .<output>.sha1 file next to the output.
+
+    Parameters
+    ----------
+    path : str
+        Path of the JSON or CSV job file.
+    workers : int | None
+        Number of worker processes, by default the number of CPUs.
+    force : bool
+        Render jobs even if their output is up to date.
+    profile : str | None
+        Print the time spent in each stage summed over all the jobs,
+        with their memory peak too if "memory", see `render_job`.
+
+    Returns
+    -------
+    int : Exit status, 1 if any job failed.
+    """
+    # Imported here since worker processes only need render_job
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    jobs = load_jobs(path)
+    pending = [job for job in jobs if force or not is_up_to_date(job)]
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} up to date job(s).", file=sys.stderr)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(render_job, job, profile): job for job in pending
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            try:
+                result = future.result()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                failed += 1
+                message = f"failed {futures[future]['output']}: {e}"
+            else:
+                message = (
+                    f"{result['output']} ({result['samples']} samples, "
+                    f"{result['time'] * 1000:.1f} ms)"
+                )
+                if profile:
+                    profiling.merge(result["profile"])
+            print(f"[{i}/{len(pending)}] {message}", file=sys.stderr)
+
+    if profile:
+        print(profiling.summary(), file=sys.stderr)
+
+    return 1 if failed else 0
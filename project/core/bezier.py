@@ -0,0 +1,167 @@
+"""
+Module for the sampling of parametric curves from error tolerances,
+by chords of adaptive length or by cubic Bezier curves.
+"""
+
+from typing import Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def chord_error_samples(t: NDArray, d2: NDArray, tol: float) -> NDArray:
+    """
+    Place samples along a parametric curve so that the distance
+    between each chord and the curve stays below a tolerance.
+
+    On an interval of length dt the curve deviates from its chord by
+    at most |r''|*dt^2/8, so the samples per unit of t are
+    sqrt(|r''|/(8*tol)). Unlike the curvature alone, |r''| also
+    bounds the error at cusps, where |r'| vanishes. The density is
+    integrated over a fine grid and inverted.
+
+    Parameters
+    ----------
+    t : NDArray
+        Fine discretization of the parameter of shape (m,),
+        must resolve the variations of the density.
+    d2 : NDArray
+        Second derivative of the curve on t, of shape (2xm) or (3xm).
+    tol : float
+        Maximum chord error.
+
+    Returns
+    -------
+    NDArray : Adaptive discretization of the parameter.
+    """
+    if tol <= 0:
+        raise ValueError("Tolerance must be positive.")
+    density = np.sqrt(np.hypot(d2[0], d2[1]) / (8 * tol))
+
+    cumulative = np.zeros_like(t)
+    np.cumsum(
+        0.5 * (density[1:] + density[:-1]) * np.diff(t), out=cumulative[1:]
+    )
+    steps = max(2, int(np.ceil(cumulative[-1])) + 1)
+    return np.interp(np.linspace(0, cumulative[-1], steps), cumulative, t)
+
+
+def revolution_knots(
+    ti: float, tf: float, speed: float, per_turn: int = 4
+) -> NDArray:
+    """
+    Split a parameter range into equal spans, a few per revolution of
+    the fastest term of a curve, as initial knots of `bezier_spans`.
+
+    Parameters
+    ----------
+    ti : float
+        Initial parameter.
+    tf : float
+        Final parameter.
+    speed : float
+        Angular speed of the fastest term of the curve.
+    per_turn : int
+        Number of spans per revolution.
+
+    Returns
+    -------
+    NDArray : Knots of shape (m,), at least the two ends.
+    """
+    turns = abs(tf - ti) * abs(speed) / (2 * np.pi)
+    return np.linspace(ti, tf, max(2, int(np.ceil(per_turn * turns)) + 1))
+
+
+def bezier_spans(
+    position: Callable[[NDArray], NDArray],
+    derivative: Callable[[NDArray], NDArray],
+    t: NDArray,
+    tol: float,
+    max_depth: int = 32,
+) -> NDArray:
+    """
+    Approximate a parametric curve by cubic Bezier curves built from
+    its exact positions and tangents.
+
+    On a span [t0, t1] of length h the Bezier curve with control
+    points r(t0), r(t0) + h/3*r'(t0), r(t1) - h/3*r'(t1) and r(t1) is
+    the cubic Hermite interpolant of the curve, whose error decreases
+    as h^4 instead of h^2 for a chord. The spans whose distance to the
+    curve at u = 1/4, 1/2 and 3/4 exceeds the tolerance are split,
+    all the spans of a level being tested at once.
+
+    Parameters
+    ----------
+    position : Callable[[NDArray], NDArray]
+        Positions of the curve for a discretization of shape (n,),
+        of shape (2xn) or (3xn).
+    derivative : Callable[[NDArray], NDArray]
+        First derivative of the curve, of the same shape.
+    t : NDArray
+        Initial knots of shape (m,), must be fine enough for the
+        error tests not to miss a feature of the curve, e.g. a few
+        per revolution of its fastest term.
+    tol : float
+        Maximum distance between the Bezier curves and the curve.
+    max_depth : int
+        Maximum number of successive splits of the initial spans.
+
+    Returns
+    -------
+    NDArray : Control points of shape (3x(3k+1)) for k spans, the
+    first point followed by the two controls and the end of each span.
+    """
+    if tol <= 0:
+        raise ValueError("Tolerance must be positive.")
+    if t.shape[0] < 2:
+        raise ValueError("At least two knots are required.")
+    u = np.array([0.25, 0.5, 0.75])[:, None]
+    # Bernstein basis of the test points, of shape (3x4)
+    basis = np.hstack(
+        [(1 - u) ** 3, 3 * (1 - u) ** 2 * u, 3 * (1 - u) * u**2, u**3]
+    )
+
+    accepted = [t[:1]]
+    t0, t1 = t[:-1], t[1:]
+    for depth in range(max_depth + 1):
+        h = t1 - t0
+        ends = position(np.concatenate([t0, t1]))[:2]
+        tangents = derivative(np.concatenate([t0, t1]))[:2] * np.tile(h, 2)
+        k = t0.shape[0]
+        p0, p3 = ends[:, :k], ends[:, k:]
+        p1 = p0 + tangents[:, :k] / 3
+        p2 = p3 - tangents[:, k:] / 3
+        # Control points of shape (2 x k x 4)
+        bezier = np.stack([p0, p1, p2, p3], axis=-1) @ basis.T
+        exact = position((t0[:, None] + u.T * h[:, None]).ravel())[:2]
+        error = np.hypot(*(bezier - exact.reshape(2, k, 3))).max(axis=1)
+        split = error > tol
+        if depth == max_depth or not split.any():
+            accepted.append(t1)
+            break
+        accepted.append(t1[~split])
+        # The error decreases as h^4, each failing span is split into
+        # the number of equal parts expected to meet the tolerance
+        parts = np.ceil((error[split] / tol) ** 0.25).astype(np.int64)
+        parts = np.maximum(parts, 2)
+        index = np.repeat(np.arange(parts.shape[0]), parts)
+        offset = np.arange(index.shape[0]) - np.repeat(
+            np.cumsum(parts) - parts, parts
+        )
+        start, length = t0[split][index], h[split][index] / parts[index]
+        t0 = start + offset * length
+        t1 = np.where(
+            offset == parts[index] - 1, t1[split][index], t0 + length
+        )
+    # The knots are sorted whichever the direction of t
+    knots = np.concatenate(accepted)
+    knots = knots[np.argsort(knots * np.sign(t[-1] - t[0]), kind="stable")]
+
+    h = np.diff(knots)
+    p = position(knots)[:2]
+    d = derivative(knots)[:2]
+    out = np.ones((3, 3 * h.shape[0] + 1))
+    out[:2, ::3] = p
+    out[:2, 1::3] = p[:, :-1] + d[:, :-1] * h / 3
+    out[:2, 2::3] = p[:, 1:] - d[:, 1:] * h / 3
+    return out
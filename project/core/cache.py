@@ -0,0 +1,238 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.typing import NDArray
+
+from project.core.epicycle import Epicycle
+from project.core.geometry import Spirograph
+from project.core.lod import LODPyramid
+
+
+class TrajectoryCache:
+    """
+    Bounded LRU cache of computed spirograph trajectories,
+    safe to share between threads.
+
+    Attributes
+    ----------
+    maxsize : int
+        Maximum number of trajectories kept in the cache.
+    hits : int
+        Number of requests served from the cache.
+    misses : int
+        Number of requests that computed a new trajectory.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[
+            tuple[float, float, float, float, int], tuple[NDArray, NDArray]
+        ] = OrderedDict()
+        # Level of detail pyramids of the cached trajectories
+        self._pyramids: dict[
+            tuple[float, float, float, float, int], LODPyramid
+        ] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, l_r: float, k_r: float, ti: float, tf: float, steps: int
+    ) -> tuple[NDArray, NDArray]:
+        """
+        Return the angles discretization and the trajectory of a
+        spirograph, computing them only if they are not cached.
+
+        Parameters
+        ----------
+        l_r : float
+            Ratio rho/r, see `Spirograph.trajectory`.
+        k_r : float
+            Ratio r/R, see `Spirograph.trajectory`.
+        ti : float
+            Initial angle t.
+        tf : float
+            Final angle t.
+        steps : int
+            Number of steps in the angle t discretization.
+
+        Returns
+        -------
+        NDArray : Read-only discretization of angle t.
+        NDArray : Read-only spirograph trajectory of shape (3xn).
+        """
+        key = TrajectoryCache._key(l_r, k_r, ti, tf, steps)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        # Computed outside of the lock so that other threads are not
+        # blocked, at worst the same entry is computed twice
+        t = Spirograph.angles(ti, tf, steps)
+        spiro = Spirograph.trajectory(l_r, k_r, t)
+        t.flags.writeable = False
+        spiro.flags.writeable = False
+        with self._lock:
+            self._entries[key] = (t, spiro)
+            if len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._pyramids.pop(evicted, None)
+        return t, spiro
+
+    def pyramid(
+        self, l_r: float, k_r: float, ti: float, tf: float, steps: int
+    ) -> LODPyramid:
+        """
+        Return the level of detail pyramid of a spirograph trajectory,
+        built only once per cached trajectory.
+
+        See Also
+        --------
+        get : Contains attribute definitions.
+        """
+        key = TrajectoryCache._key(l_r, k_r, ti, tf, steps)
+        with self._lock:
+            entry = self._entries.get(key)
+            pyramid = self._pyramids.get(key)
+        if entry is None:
+            spiro = self.get(l_r, k_r, ti, tf, steps)[1]
+        else:
+            spiro = entry[1]
+            if pyramid is not None and pyramid.a is spiro:
+                return pyramid
+        pyramid = LODPyramid(spiro)
+        with self._lock:
+            # Not kept if the trajectory was evicted in the meantime
+            if key in self._entries and self._entries[key][1] is spiro:
+                self._pyramids[key] = pyramid
+        return pyramid
+
+    @staticmethod
+    def _key(
+        l_r: float, k_r: float, ti: float, tf: float, steps: int
+    ) -> tuple[float, float, float, float, int]:
+        return (float(l_r), float(k_r), float(ti), float(tf), int(steps))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._pyramids.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class TrajectoryStore:
+    """
+    On-disk store of epicycle trajectories too long to fit in memory.
+
+    Each trajectory is evaluated chunk by chunk into a .npy file
+    named after a hash of the circle parameters, of the evaluation
+    method and of the time range, later requests reopen the file as
+    a read-only memory map. The memory maps can be passed to
+    `Transform` and `SVGEncoder`, which read them one chunk at a time.
+
+    Attributes
+    ----------
+    directory : str
+        Directory of the .npy files.
+    hits : int
+        Number of requests served from an existing file.
+    misses : int
+        Number of requests that evaluated a new trajectory.
+    """
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path(
+        self, epicycle: Epicycle, ti: float, tf: float, steps: int
+    ) -> str:
+        """Path of the file storing a trajectory."""
+        digest = hashlib.sha1()
+        # pylint: disable-next=protected-access
+        for array in epicycle._parameters():
+            digest.update(array.tobytes())
+        digest.update(np.array([ti, tf], dtype=np.float64).tobytes())
+        # Each method gives a slightly different rounding of the samples
+        digest.update(
+            str((int(steps), epicycle.dtype.str, epicycle.method)).encode()
+        )
+        return os.path.join(self.directory, digest.hexdigest() + ".npy")
+
+    def get(
+        self,
+        epicycle: Epicycle,
+        ti: float,
+        tf: float,
+        steps: int,
+        chunk_size: int = 2**16,
+    ) -> NDArray:
+        """
+        Return the trajectory of an epicycle over
+        np.linspace(ti, tf, steps), evaluating it only if
+        it is not stored yet.
+
+        Parameters
+        ----------
+        epicycle : Epicycle
+            Epicycle whose circles define the trajectory.
+        ti : float
+            Initial time.
+        tf : float
+            Final time.
+        steps : int
+            Number of samples.
+        chunk_size : int
+            Number of samples evaluated and written at once.
+
+        Returns
+        -------
+        NDArray : Read-only memory map of the trajectory of shape (3xn).
+        """
+        path = self.path(epicycle, ti, tf, steps)
+        if os.path.exists(path):
+            self.hits += 1
+            return np.load(path, mmap_mode="r")
+        self.misses += 1
+
+        # Written under a temporary name so that an interrupted
+        # evaluation never leaves a partial file behind
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        out = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=epicycle.dtype, shape=(3, steps)
+        )
+        try:
+            start = 0
+            for chunk in epicycle.chunks(ti, tf, steps, chunk_size):
+                out[:, start : start + chunk.shape[1]] = chunk
+                start += chunk.shape[1]
+            out.flush()
+        except BaseException:
+            del out
+            os.remove(tmp)
+            raise
+        del out
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r")
+
+    def clear(self) -> None:
+        """Remove all the stored trajectories."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                os.remove(os.path.join(self.directory, name))
+        self.hits = 0
+        self.misses = 0
@@ -1,7 +1,216 @@
-from typing import Any
+from typing import Any, Iterator
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
+
+from project.core import profiling
+from project.core.bezier import (
+    bezier_spans,
+    chord_error_samples,
+    revolution_knots,
+)
+from project.core.geometry import (
+    recurrence_circles,
+    rotational_symmetry,
+    uniform_step,
+)
+
+CHUNK_SIZE = 2**20
+METHODS = ("auto", "direct", "fft", "recurrence", "symmetry")
+# Below this number of circles the direct sum is faster than the FFT
+FFT_MIN_CIRCLES = 4
+
+
+def sum_circles(
+    radius: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    angle_i: NDArray[np.float64],
+    time: NDArray[np.float64],
+    out: NDArray | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> NDArray:
+    """
+    Evaluate the sum of many rotating circles in bulk.
+
+    Parameters
+    ----------
+    radius : NDArray
+        Radii of the circles, of shape (m,).
+    speed : NDArray
+        Angular speeds of the circles, of shape (m,).
+    angle_i : NDArray
+        Initial angles of the circles, of shape (m,).
+    time : NDArray
+        Time discretization of shape (n,).
+    out : NDArray | None
+        Optional output array of shape (2xn) the x and y
+        coordinates are written into, may be of lower precision
+        since the sums are computed in double precision.
+    chunk_size : int
+        Maximum number of (sample, circle) pairs evaluated at once,
+        bounds the peak memory of the temporaries.
+
+    Returns
+    -------
+    NDArray : Summed x and y coordinates of shape (2xn).
+    """
+    radius = np.asarray(radius, dtype=np.float64)
+    speed = np.asarray(speed, dtype=np.float64)
+    angle_i = np.asarray(angle_i, dtype=np.float64)
+    if out is None:
+        out = np.empty((2, time.shape[0]), dtype=np.float64)
+    if radius.shape[0] == 0:
+        out[:] = 0.0
+        return out
+
+    rows = max(1, chunk_size // radius.shape[0])
+    for start in range(0, time.shape[0], rows):
+        stop = min(start + rows, time.shape[0])
+        angles = np.multiply.outer(time[start:stop], speed)
+        angles += angle_i
+        terms = np.cos(angles)
+        terms *= radius
+        terms.sum(axis=1, dtype=np.float64, out=out[0, start:stop])
+        np.sin(angles, out=terms)
+        terms *= radius
+        terms.sum(axis=1, dtype=np.float64, out=out[1, start:stop])
+
+    return out
+
+
+def fft_circles(
+    radius: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    angle_i: NDArray[np.float64],
+    time: NDArray[np.float64],
+    out: NDArray | None = None,
+    max_size: int | None = None,
+) -> NDArray | None:
+    """
+    Evaluate the sum of rotating circles with an inverse FFT.
+
+    With integer speeds of greatest common divisor g, the sum is a
+    trigonometric polynomial of period 2*pi/g. If the time step h
+    splits this period into an integer number N of samples, each
+    circle is a single frequency bin of an N points inverse FFT,
+    whose result is repeated over the n samples. The cost is
+    O(N log N) instead of O(m n) for m circles.
+
+    Parameters
+    ----------
+    radius : NDArray
+        Radii of the circles, of shape (m,).
+    speed : NDArray
+        Angular speeds of the circles, of shape (m,).
+    angle_i : NDArray
+        Initial angles of the circles, of shape (m,).
+    time : NDArray
+        Time discretization of shape (n,).
+    out : NDArray | None
+        Optional output array of shape (2xn).
+    max_size : int | None
+        Largest FFT size allowed, by default 2n.
+
+    Returns
+    -------
+    NDArray | None : Summed x and y coordinates of shape (2xn),
+    None if the speeds are not integers or the time grid does not
+    fit the period.
+    """
+    n = time.shape[0]
+    step = uniform_step(time)
+    if step is None:
+        return None
+    z = fft_period(
+        radius,
+        speed,
+        angle_i,
+        time[0],
+        step,
+        2 * n if max_size is None else max_size,
+    )
+    if z is None:
+        return None
+
+    if out is None:
+        out = np.empty((2, n), dtype=np.float64)
+    size = z.shape[0]
+    indices = np.arange(n) % size if n > size else slice(0, n)
+    out[0] = z.real[indices]
+    out[1] = z.imag[indices]
+    return out
+
+
+def fft_period(
+    radius: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    angle_i: NDArray[np.float64],
+    t0: float,
+    step: float,
+    max_size: int,
+) -> NDArray[np.complex128] | None:
+    """
+    Evaluate one period of the sum of rotating circles on a uniform
+    time grid with an inverse FFT, see `fft_circles`.
+
+    Parameters
+    ----------
+    radius : NDArray
+        Radii of the circles, of shape (m,).
+    speed : NDArray
+        Angular speeds of the circles, of shape (m,).
+    angle_i : NDArray
+        Initial angles of the circles, of shape (m,).
+    t0 : float
+        First time of the grid.
+    step : float
+        Time step of the grid.
+    max_size : int
+        Largest FFT size allowed.
+
+    Returns
+    -------
+    NDArray | None : Sums as complex numbers x + iy at the N samples
+    of a period from t0, sample k of the grid is sample k % N. None
+    if the speeds are not integers or the step does not fit the
+    period.
+    """
+    radius = np.asarray(radius, dtype=np.float64)
+    speed = np.asarray(speed, dtype=np.float64)
+    angle_i = np.asarray(angle_i, dtype=np.float64)
+    if not step or not np.array_equal(speed, np.round(speed)):
+        return None
+    integers = np.abs(speed).astype(np.int64)
+    if not integers.any():
+        return None
+
+    # A full period of the gcd is tried first, then of speed 1. The
+    # period must hold a whole number of steps up to rounding errors,
+    # as in `uniform_step`, a looser match drifts over the grid
+    period = None
+    for g in dict.fromkeys((int(np.gcd.reduce(integers)), 1)):
+        samples = 2 * np.pi / (g * abs(step))
+        deviation = abs(samples - round(samples))
+        if deviation <= 64 * np.finfo(np.float64).eps * samples:
+            period = g, round(samples)
+            break
+    if period is None:
+        return None
+    g, size = period
+    if not 0 < size <= max_size:
+        return None
+
+    # Bin of each circle, the phase at the first sample included
+    bins = np.round(speed).astype(np.int64) // g * int(np.sign(step)) % size
+    coefficients = np.zeros(size, dtype=np.complex128)
+    np.add.at(
+        coefficients,
+        bins,
+        radius * np.exp(1j * (speed * t0 + angle_i)),
+    )
+    z = np.fft.ifft(coefficients)
+    z *= size
+    return z
 
 
 class Circle:
@@ -18,6 +227,7 @@ class Circle:
         self._angles: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
         self._local_x: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
         self._local_y: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
+        self._time: NDArray[np.float64] | None = None
         if angles is None:
             self._angles = np.empty((0,), dtype=np.float64)
         else:
@@ -25,10 +235,11 @@ class Circle:
 
     @property
     def local_trajectory(self) -> NDArray[np.float64]:
-        return np.stack([self._local_x, self._local_y])
+        return np.stack([self.local_x, self.local_y])
 
     @property
     def angles(self) -> NDArray[np.float64]:
+        self._compute_arrays()
         return self._angles
 
     @angles.setter
@@ -39,6 +250,7 @@ class Circle:
 
     @property
     def local_x(self) -> NDArray[np.float64]:
+        self._compute_arrays()
         return self._local_x
 
     @local_x.setter
@@ -49,6 +261,7 @@ class Circle:
 
     @property
     def local_y(self) -> NDArray[np.float64]:
+        self._compute_arrays()
         return self._local_y
 
     @local_y.setter
@@ -58,54 +271,215 @@ class Circle:
         )
 
     def update_arrays(self, time: NDArray[np.float64]) -> None:
+        """
+        Set a new time array, the per-circle arrays are only
+        computed when they are first accessed.
+        """
         if isinstance(time, np.ndarray) and len(time.shape) == 1:
-            self._angles = time * self.speed + self.angle_i
-            self._local_x = self.radius * np.cos(self._angles)
-            self._local_y = self.radius * np.sin(self._angles)
+            self._time = time
         else:
             raise ValueError(
                 "Time must be set to numpy NDArray of shape (n,)."
             )
 
+    def _compute_arrays(self) -> None:
+        if self._time is not None:
+            self._angles = self._time * self.speed + self.angle_i
+            self._local_x = self.radius * np.cos(self._angles)
+            self._local_y = self.radius * np.sin(self._angles)
+            self._time = None
+
+
+class LeanCircle:
+    """
+    Circle that only stores its parameters, its local trajectory
+    is computed on request and never kept.
+    """
+
+    __slots__ = ("radius", "speed", "angle_i")
+
+    def __init__(
+        self, radius: float = 0.0, speed: float = 0.0, angle_i: float = 0.0
+    ) -> None:
+        self.radius = radius
+        self.speed = speed
+        self.angle_i = angle_i
+
+    def local_trajectory(
+        self, time: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        angles = time * self.speed + self.angle_i
+        return np.stack(
+            [self.radius * np.cos(angles), self.radius * np.sin(angles)]
+        )
+
 
 class Epicycle:
-    def __init__(self) -> None:
-        self._circles: list[Circle] = []
-        self._time: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
-        self._x: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
-        self._y: NDArray[np.float64] = np.empty((0,), dtype=np.float64)
+    """
+    Class used to evaluate the sum of rotating circles.
+
+    Attributes
+    ----------
+    chunk_size : int
+        Maximum number of (sample, circle) pairs evaluated at once
+        when the trajectory is computed.
+    lean : bool
+        If True the circles only store their parameters and no
+        per-circle sample arrays are ever kept.
+    dtype : DTypeLike
+        Data type of the trajectory, e.g. np.float32 to halve its
+        memory. Time and sums are always computed in double precision.
+    method : str
+        Evaluation of the trajectory, "direct" sums the circles,
+        "fft" uses an inverse FFT (see `fft_circles`) and fails if
+        the speeds or the time grid do not allow it, "recurrence"
+        rotates the circles by complex products on uniform time
+        grids (see `recurrence_circles`), "symmetry" evaluates a
+        single lobe and rotates it (see `symmetry`), "auto" uses the
+        FFT when possible and faster, the direct sum otherwise.
+    workers : int | None
+        Number of threads evaluating chunks of samples with the
+        direct method or reading them from the FFT period, None for
+        the number of CPUs. The result is identical to the one of a
+        single thread. The recurrence and symmetry methods only run
+        on one thread.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_SIZE,
+        lean: bool = False,
+        dtype: DTypeLike = np.float64,
+        method: str = "auto",
+        workers: int | None = 1,
+    ) -> None:
+        if method not in METHODS:
+            raise ValueError(f"Method must be one of {METHODS}.")
+        self.method = method
+        self.workers = workers
+        self._check_workers()
+        self.chunk_size = chunk_size
+        self.lean = lean
+        self.dtype = np.dtype(dtype)
+        self._circles: list[Circle | LeanCircle] = []
+        # Time and trajectory are stored in buffers that can grow,
+        # only the first _size samples are valid
+        self._size = 0
+        self._time_buffer: NDArray[np.float64] = np.empty(
+            (0,), dtype=np.float64
+        )
+        self._buffer: NDArray[np.float64] = np.empty((3, 0), dtype=np.float64)
         self._period_changed = True
         self._trajectory_changed = True
         self._period: float = 0.0
-        self._trajectory: NDArray[np.float64] = np.empty(
-            (0,), dtype=np.float64
+
+    @classmethod
+    def fit(
+        cls,
+        points: NDArray,
+        k: int | None = None,
+        tol: float | None = None,
+        samples: int | None = None,
+        **kwargs: Any,
+    ) -> tuple["Epicycle", float]:
+        """
+        Build the epicycle drawing a closed curve.
+
+        The curve is resampled uniformly by arc length and its FFT
+        gives one circle per frequency, of integer speed, so that the
+        epicycle draws the curve once over a time of 2*pi. Only the
+        largest circles are kept.
+
+        Parameters
+        ----------
+        points : NDArray
+            Points of the curve of shape (2xn) or (3xn), the last
+            point is joined back to the first one.
+        k : int | None
+            Maximum number of circles.
+        tol : float | None
+            Target root mean square distance between the curve and
+            the epicycle, the fewest circles reaching it are kept.
+        samples : int | None
+            Number of samples of the resampled curve,
+            by default the number of points.
+        **kwargs : Any
+            Arguments of the Epicycle constructor.
+
+        Returns
+        -------
+        Epicycle : Epicycle with its circles sorted by decreasing radius.
+        float : Root mean square distance between the resampled
+        curve and the epicycle.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or points.shape[0] not in (2, 3):
+            raise ValueError("Points must be of shape (2xn) or (3xn).")
+        z = points[0] + 1j * points[1]
+        samples = z.shape[0] if samples is None else samples
+        if samples < 1:
+            raise ValueError("Number of samples must be positive.")
+
+        # Uniform resampling by arc length of the closed polyline
+        closed = np.append(z, z[:1])
+        arc = np.zeros(closed.shape[0])
+        np.cumsum(np.abs(np.diff(closed)), out=arc[1:])
+        if arc[-1] > 0:
+            s = np.linspace(0, arc[-1], samples, endpoint=False)
+            z = np.interp(s, arc, closed.real) + 1j * np.interp(
+                s, arc, closed.imag
+            )
+        else:
+            z = np.full(samples, closed[0])
+
+        coefficients = np.fft.fft(z) / samples
+        speed = np.round(np.fft.fftfreq(samples, 1 / samples))
+        order = np.argsort(-np.abs(coefficients), kind="stable")
+        # By Parseval, the mean square error is the energy of the
+        # circles left out
+        energy = np.abs(coefficients[order]) ** 2
+        residual = np.append(np.cumsum(energy[::-1])[::-1], 0.0)
+        count = samples if k is None else min(k, samples)
+        if tol is not None:
+            count = min(count, int(np.argmax(residual <= tol**2)))
+        order = order[:count]
+
+        epicycle = cls(**kwargs)
+        epicycle.add_circles(
+            list(np.abs(coefficients[order])),
+            list(speed[order]),
+            list(np.angle(coefficients[order])),
         )
+        return epicycle, float(np.sqrt(residual[count]))
 
     @property
-    def time(self) -> NDArray[np.float64] | None:
-        return self._time
+    def time(self) -> NDArray[np.float64]:
+        return self._time_buffer[: self._size]
 
     @time.setter
     def time(self, value: Any) -> None:
         if isinstance(value, np.ndarray) and len(value.shape) == 1:
-            self._time = value.astype(np.float64)
-            self._x = np.zeros_like(self._time)
-            self._y = np.zeros_like(self._time)
-            for circle in self._circles:
-                circle.update_arrays(self._time)
-            self._update_xy()
+            size = self._size
+            if (
+                0 < size <= value.shape[0]
+                and not self._trajectory_changed
+                and np.array_equal(value[:size], self.time)
+            ):
+                # Only the samples appended at the end are new
+                self.extend(value[size:])
+                return
+            self._size = 0
+            self._reserve(value.shape[0], exact=True)
+            self.extend(value)
         else:
             raise ValueError("Time must be set to numpy NDArray or None.")
 
     @property
-    def trajectory(self) -> NDArray[np.float64]:
+    def trajectory(self) -> NDArray:
         if self._trajectory_changed:
-            self._trajectory = np.stack(
-                [self._x, self._y, np.ones_like(self._time)]
-            )
-            self._trajectory_changed = False
+            self._update_xy()
 
-        return self._trajectory
+        return self._buffer[:, : self._size]
 
     @trajectory.setter
     def trajectory(self) -> None:
@@ -113,10 +487,57 @@ class Epicycle:
             "Cannot set trajectory directly. Set new time array to update."
         )
 
+    def extend(self, time: NDArray[np.float64]) -> None:
+        """
+        Append new samples at the end of the time array, only the
+        new samples are evaluated.
+
+        Parameters
+        ----------
+        time : NDArray
+            Time samples to append, of shape (k,).
+        """
+        if not (isinstance(time, np.ndarray) and len(time.shape) == 1):
+            raise ValueError(
+                "Time must be set to numpy NDArray of shape (k,)."
+            )
+        start = self._size
+        stop = start + time.shape[0]
+        self._reserve(stop)
+        self._time_buffer[start:stop] = time
+        self._size = stop
+        self._update_circles()
+        if self._trajectory_changed:
+            self._update_xy()
+        else:
+            self._evaluate(start, stop)
+
+    def _reserve(self, size: int, exact: bool = False) -> None:
+        """
+        Grow the buffers to hold at least size samples, doubling
+        their capacity so that repeated extensions are amortized.
+        """
+        capacity = self._time_buffer.shape[0]
+        if size <= capacity and not exact:
+            return
+        if not exact:
+            size = max(size, 2 * capacity)
+        time_buffer = np.empty((size,), dtype=np.float64)
+        buffer = np.empty((3, size), dtype=self.dtype)
+        time_buffer[: self._size] = self._time_buffer[: self._size]
+        buffer[:, : self._size] = self._buffer[:, : self._size]
+        self._time_buffer = time_buffer
+        self._buffer = buffer
+
     def add_circle(
         self, radius: float = 0.0, speed: float = 0.0, angle_i: float = 0.0
     ) -> None:
-        self._circles.append(Circle(radius, speed, angle_i, self._time))
+        if self.lean:
+            self._circles.append(LeanCircle(radius, speed, angle_i))
+        else:
+            circle = Circle(radius, speed, angle_i)
+            circle.update_arrays(self.time)
+            self._circles.append(circle)
         self._period_changed = True
         self._trajectory_changed = True
 
@@ -127,15 +548,347 @@ class Epicycle:
             raise ValueError("Input lists must all have the same shape (n,).")
         for i in range(len(radius)):
             self.add_circle(radius[i], speed[i], angle_i[i])
-        self._update_xy()
 
-    def _update_xy(self) -> None:
-        self._x = np.zeros_like(self._time)
-        self._y = np.zeros_like(self._time)
+    def local_trajectory(self, index: int) -> NDArray[np.float64]:
+        """
+        Calculate the local trajectory of a single circle
+        over the current time array.
+
+        Parameters
+        ----------
+        index : int
+            Index of the circle.
+
+        Returns
+        -------
+        NDArray : Local trajectory of the circle of shape (2xn).
+        """
+        circle = self._circles[index]
+        if isinstance(circle, LeanCircle):
+            return circle.local_trajectory(self.time)
+        return circle.local_trajectory
+
+    def derivative(
+        self, time: NDArray[np.float64], order: int = 1
+    ) -> NDArray[np.float64]:
+        """
+        Calculate the derivative of the trajectory with respect to time.
+
+        Parameters
+        ----------
+        time : NDArray
+            Time discretization of shape (n,).
+        order : int
+            Order of the derivative.
+
+        Returns
+        -------
+        NDArray : Derivative of shape (3xn), the last row is zero
+        since the derivative is a direction in homogeneous coordinates.
+        """
+        radius, speed, angle_i = self._parameters()
+        out = np.zeros((3, time.shape[0]), dtype=np.float64)
+        # Each derivative scales a circle by its speed
+        # and rotates its phase by pi/2
+        with profiling.stage("trajectory", time.shape[0]):
+            sum_circles(
+                radius * speed**order,
+                speed,
+                angle_i + order * np.pi / 2,
+                time,
+                out=out[:2],
+                chunk_size=self.chunk_size,
+            )
+        return out
+
+    def adaptive_time(
+        self,
+        ti: float,
+        tf: float,
+        tol: float = 1e-3,
+        fine_steps: int | None = None,
+    ) -> NDArray[np.float64]:
+        """
+        Calculate a time discretization from a chord error tolerance
+        instead of a fixed number of steps.
+
+        Parameters
+        ----------
+        ti : float
+            Initial time.
+        tf : float
+            Final time.
+        tol : float
+            Maximum distance between the sampled polyline and the curve.
+        fine_steps : int | None
+            Number of steps used to integrate the sample density,
+            by default 64 per revolution of the fastest circle.
+
+        Returns
+        -------
+        NDArray : Time discretization.
+        """
+        if fine_steps is None:
+            speed = max([1.0] + [abs(c.speed) for c in self._circles])
+            turns = abs(tf - ti) * speed / (2 * np.pi)
+            fine_steps = max(1024, int(64 * turns))
+        t = np.linspace(ti, tf, fine_steps)
+        return chord_error_samples(t, self.derivative(t, 2), tol)
+
+    def bezier(
+        self, ti: float, tf: float, tol: float = 1e-3
+    ) -> NDArray[np.float64]:
+        """
+        Approximate the trajectory by cubic Bezier curves with
+        spans chosen from an error tolerance, see `bezier_spans`.
+
+        Parameters
+        ----------
+        ti : float
+            Initial time.
+        tf : float
+            Final time.
+        tol : float
+            Maximum distance between the Bezier curves and the curve.
+
+        Returns
+        -------
+        NDArray : Control points of shape (3x(3k+1)) for k spans.
+        """
+        speed = max([1.0] + [abs(c.speed) for c in self._circles])
+        t = revolution_knots(ti, tf, speed)
+        # The derivative of order 0 is the trajectory itself
+        return bezier_spans(
+            lambda time: self.derivative(time, 0), self.derivative, t, tol
+        )
+
+    def chunks(
+        self, ti: float, tf: float, steps: int, chunk_size: int = 2**16
+    ) -> Iterator[NDArray]:
+        """
+        Evaluate the trajectory over np.linspace(ti, tf, steps) one
+        chunk of samples at a time, without storing the time array or
+        the trajectory.
+
+        Parameters
+        ----------
+        ti : float
+            Initial time.
+        tf : float
+            Final time.
+        steps : int
+            Number of samples.
+        chunk_size : int
+            Number of samples per chunk.
+
+        Yields
+        ------
+        NDArray
+            Trajectory chunk of shape (3xchunk_size),
+            the last chunk may be shorter.
+        """
+        parameters = self._parameters()
+        # Each chunk is computed from the step of the whole grid
+        step = (tf - ti) / (steps - 1) if steps > 1 else 0.0
+        # The FFT of the whole grid is computed once and every chunk
+        # reads its samples from it, as the in-memory evaluation does
+        z = self._fft(parameters, ti, step, steps) if steps > 1 else None
+        for start in range(0, steps, chunk_size):
+            stop = min(start + chunk_size, steps)
+            time = ti + step * np.arange(start, stop, dtype=np.float64)
+            if stop == steps and steps > 1:
+                # The grid ends exactly at tf, as with np.linspace
+                time[-1] = tf
+            out = np.empty((3, stop - start), dtype=self.dtype)
+            with profiling.stage("trajectory", stop - start):
+                if z is None:
+                    self._sum(parameters, time, out[:2], size=steps)
+                else:
+                    self._read_period(z, start, out[:2])
+            out[2] = 1.0
+            yield out
+
+    def _parameters(self) -> tuple[NDArray, NDArray, NDArray]:
+        """Return the radius, speed and initial angle of all circles."""
+        circles = self._circles
+        return (
+            np.array([circle.radius for circle in circles], dtype=float),
+            np.array([circle.speed for circle in circles], dtype=float),
+            np.array([circle.angle_i for circle in circles], dtype=float),
+        )
+
+    def _update_circles(self) -> None:
         for circle in self._circles:
-            self._x += circle.local_x
-            self._y += circle.local_y
-        self._trajectory_changed = True
+            # Lean circles do not store their arrays
+            if isinstance(circle, Circle):
+                circle.update_arrays(self.time)
+
+    def _update_xy(self) -> None:
+        self._evaluate(0, self._size)
+        self._trajectory_changed = False
+
+    def _evaluate(self, start: int, stop: int) -> None:
+        """Evaluate the trajectory of the samples from start to stop."""
+        with profiling.stage("trajectory", stop - start):
+            self._sum(
+                self._parameters(),
+                self._time_buffer[start:stop],
+                self._buffer[:2, start:stop],
+                size=stop,
+            )
+        self._buffer[2, start:stop] = 1.0
+
+    def _fft(
+        self,
+        parameters: tuple[NDArray, NDArray, NDArray],
+        t0: float,
+        step: float | None,
+        size: int,
+    ) -> NDArray[np.complex128] | None:
+        """
+        Evaluate one period of a grid of size samples with the FFT if
+        the method uses it, see `fft_period`. None if the method does
+        not use the FFT or, with "auto", if the grid does not allow it.
+        """
+        method = self.method
+        if method != "fft" and (
+            method != "auto" or parameters[0].shape[0] < FFT_MIN_CIRCLES
+        ):
+            return None
+        z = None
+        if step is not None:
+            z = fft_period(*parameters, t0, step, 2 * size)
+        if z is None and method == "fft":
+            raise ValueError(
+                "FFT evaluation requires integer speeds and a uniform "
+                "time grid with an integer number of samples per period."
+            )
+        return z
+
+    def _sum(
+        self,
+        parameters: tuple[NDArray, NDArray, NDArray],
+        time: NDArray[np.float64],
+        out: NDArray,
+        size: int | None = None,
+    ) -> None:
+        """
+        Sum the circles with the selected method. The time samples
+        may be part of a larger grid of size samples, which bounds
+        the size of the FFT.
+        """
+        method = self.method
+        # The attributes may have changed since the construction
+        self._check_workers()
+        n = time.shape[0]
+        if n < 2:
+            # A single sample has no time step, it is summed directly
+            sum_circles(*parameters, time, out=out, chunk_size=self.chunk_size)
+            return
+        z = self._fft(
+            parameters,
+            time[0],
+            uniform_step(time),
+            n if size is None else size,
+        )
+        if z is not None:
+            self._read_period(z, 0, out)
+            return
+        if method == "symmetry":
+            symmetry = self.symmetry()
+            if symmetry is None or (
+                rotational_symmetry(
+                    lambda lobe: sum_circles(
+                        *parameters, lobe, chunk_size=self.chunk_size
+                    ),
+                    time,
+                    *symmetry,
+                    out=out,
+                )
+                is None
+            ):
+                raise ValueError(
+                    "Symmetry evaluation requires integer speeds and a "
+                    "uniform time grid with whole samples per lobe."
+                )
+            return
+        if method == "recurrence":
+            # Not used by "auto" since its result depends on the
+            # chunks, up to a few ulp
+            if (
+                recurrence_circles(
+                    *parameters, time, out=out, chunk_size=self.chunk_size
+                )
+                is None
+            ):
+                raise ValueError(
+                    "Recurrence evaluation requires a uniform time grid."
+                )
+            return
+
+        def evaluate(start: int, stop: int) -> None:
+            sum_circles(
+                *parameters,
+                time[start:stop],
+                out=out[:, start:stop],
+                chunk_size=self.chunk_size,
+            )
+
+        # pylint: disable-next=import-outside-toplevel
+        from project.core.parallel import map_chunks
+
+        map_chunks(evaluate, n, self.workers)
+
+    def _check_workers(self) -> None:
+        """Raise if the method can not run on several workers."""
+        if self.workers != 1 and self.method in ("recurrence", "symmetry"):
+            raise ValueError(
+                f"The {self.method} method requires a single worker."
+            )
+
+    def _read_period(
+        self, z: NDArray[np.complex128], start: int, out: NDArray
+    ) -> None:
+        """
+        Read the samples start to start + n of a grid from one period
+        z of its FFT evaluation into out of shape (2xn).
+        """
+
+        def read(i: int, j: int) -> None:
+            indices = np.arange(start + i, start + j) % z.shape[0]
+            out[0, i:j] = z.real[indices]
+            out[1, i:j] = z.imag[indices]
+
+        # pylint: disable-next=import-outside-toplevel
+        from project.core.parallel import map_chunks
+
+        map_chunks(read, out.shape[1], self.workers)
+
+    def symmetry(self) -> tuple[float, float] | None:
+        """
+        Find the rotational symmetry of the trajectory.
+
+        With integer speeds of which q is the greatest common divisor
+        of the differences, every circle turns by the same angle
+        2*pi*s/q modulo 2*pi in a time 2*pi/q, so the trajectory is
+        made of q lobes, each one the previous one rotated. Circles
+        of a single speed, e.g. a single circle, form a single lobe
+        over a time 2*pi.
+
+        Returns
+        -------
+        tuple[float, float] | None : Time between two lobes and
+        rotation between them, None if the speeds are not integers.
+        """
+        speed = self._parameters()[1]
+        if not speed.shape[0] or not np.array_equal(speed, np.round(speed)):
+            return None
+        speed = speed.astype(np.int64)
+        lobes = int(np.gcd.reduce(np.abs(speed - speed[0])))
+        if lobes == 0:
+            # Trivial symmetry of order 1
+            return 2 * np.pi, 0.0
+        return 2 * np.pi / lobes, 2 * np.pi * int(speed[0] % lobes) / lobes
 
     @property
     def period(self) -> float:
@@ -1,8 +1,11 @@
-import matplotlib.animation as animation
-import matplotlib.pyplot as plt
+from fractions import Fraction
+from typing import Callable, Iterator
+
 import numpy as np
 from numpy.typing import NDArray
 
+from project.core import bezier, profiling
+
 
 def n_polygon(n: int) -> NDArray:
     """
@@ -23,33 +26,462 @@ def n_polygon(n: int) -> NDArray:
     return np.stack([np.cos(angles), np.sin(angles), np.ones_like(angles)])
 
 
+def uniform_step(t: NDArray) -> float | None:
+    """
+    Return the step of a uniform discretization, as produced by
+    np.linspace or np.arange, up to rounding errors.
+
+    Parameters
+    ----------
+    t : NDArray
+        Discretization of shape (n,).
+
+    Returns
+    -------
+    float | None : Step, None if the discretization has less than
+    two samples, a zero step or is not uniform.
+    """
+    n = t.shape[0]
+    if n < 2:
+        return None
+    step = (t[-1] - t[0]) / (n - 1)
+    if step == 0:
+        return None
+    scale = max(abs(t[0]), abs(t[-1]))
+    deviation = np.abs(t - (t[0] + np.arange(n) * step)).max()
+    if deviation > 64 * np.finfo(np.float64).eps * scale:
+        return None
+    return float(step)
+
+
+def recurrence_circles(
+    radius: NDArray,
+    speed: NDArray,
+    angle_i: NDArray,
+    time: NDArray,
+    out: NDArray | None = None,
+    chunk_size: int = 2**20,
+) -> NDArray | None:
+    """
+    Evaluate the sum of rotating circles on a uniform time grid
+    without evaluating trigonometric functions at every sample.
+
+    On a grid of step h, each circle turns by the same angle s*h at
+    every step. The samples are split into blocks of about sqrt(n)
+    samples: the position at the start of each block (the anchor)
+    and the rotations by 0 to B-1 steps are the only exponentials
+    evaluated, every sample is the product of an anchor and a
+    rotation. The sum over the circles of these products is a
+    single complex matrix product.
+
+    Since every sample is re-anchored, rounding errors do not
+    accumulate along the grid: each circle is off by at most about
+    4 ulp of its radius, on top of the rounding of the angle that
+    the direct evaluation has too.
+
+    Parameters
+    ----------
+    radius : NDArray
+        Radii of the circles, of shape (m,).
+    speed : NDArray
+        Angular speeds of the circles, of shape (m,).
+    angle_i : NDArray
+        Initial angles of the circles, of shape (m,).
+    time : NDArray
+        Uniform time discretization of shape (n,).
+    out : NDArray | None
+        Optional output array of shape (2xn).
+    chunk_size : int
+        Maximum number of exponentials evaluated at once.
+
+    Returns
+    -------
+    NDArray | None : Summed x and y coordinates of shape (2xn),
+    None if the time discretization is not uniform.
+    """
+    radius = np.asarray(radius, dtype=np.float64)
+    speed = np.asarray(speed, dtype=np.float64)
+    angle_i = np.asarray(angle_i, dtype=np.float64)
+    step = uniform_step(time)
+    if step is None:
+        return None
+    n = time.shape[0]
+    block = int(np.ceil(np.sqrt(n)))
+    offsets = np.arange(block) * step
+
+    z = np.zeros((-(-n // block), block), dtype=np.complex128)
+    group = max(1, chunk_size // (z.shape[0] + block))
+    for start in range(0, radius.shape[0], group):
+        circles = slice(start, start + group)
+        anchors = np.exp(
+            1j
+            * (
+                np.multiply.outer(time[::block], speed[circles])
+                + angle_i[circles]
+            )
+        )
+        anchors *= radius[circles]
+        rotations = np.exp(1j * np.multiply.outer(speed[circles], offsets))
+        z += anchors @ rotations
+
+    if out is None:
+        out = np.empty((2, n), dtype=np.float64)
+    out[0] = z.real.ravel()[:n]
+    out[1] = z.imag.ravel()[:n]
+    return out
+
+
+def rotational_symmetry(
+    evaluate: Callable[[NDArray], NDArray],
+    time: NDArray,
+    period: float,
+    angle: float,
+    out: NDArray | None = None,
+) -> NDArray | None:
+    """
+    Evaluate a curve with a rotational symmetry on a uniform time
+    grid from a single lobe.
+
+    The curve verifies r(t + period) = R(angle) r(t), so when the
+    time step splits the period into an integer number M of samples
+    only the first M samples are evaluated, every following lobe is
+    the first one rotated by a multiple of the angle, with a batch
+    of the rotation matrices of `Transform.rotate`. A grid shorter
+    than a lobe has nothing to rotate and is evaluated directly.
+
+    Parameters
+    ----------
+    evaluate : Callable[[NDArray], NDArray]
+        Function returning the x and y coordinates of the curve,
+        of shape (2xm), over a time discretization of shape (m,).
+    time : NDArray
+        Uniform time discretization of shape (n,).
+    period : float
+        Time between two lobes.
+    angle : float
+        Rotation between two lobes in radians.
+    out : NDArray | None
+        Optional output array of shape (2xn).
+
+    Returns
+    -------
+    NDArray | None : Coordinates of shape (2xn), None if the
+    time step does not split the period into whole samples.
+    """
+    n = time.shape[0]
+    if n < 2 or abs(time[-1] - time[0]) < period:
+        lobe = evaluate(time)
+        if out is None:
+            return lobe
+        out[...] = lobe
+        return out
+    step = uniform_step(time)
+    if step is None:
+        return None
+    samples = period / abs(step)
+    if abs(samples - round(samples)) > 1e-9 * samples or samples < 1:
+        return None
+    size = min(round(samples), n)
+    lobes = -(-n // size)
+
+    lobe = evaluate(time[:size])
+    # The lobes of a decreasing time grid turn backwards
+    angles = np.arange(lobes) * (angle if step > 0 else -angle)
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    rotations = np.empty((lobes, 2, 2))
+    rotations[:, 0, 0] = cos
+    rotations[:, 0, 1] = -sin
+    rotations[:, 1, 0] = sin
+    rotations[:, 1, 1] = cos
+
+    if out is None:
+        out = np.empty((2, n), dtype=np.float64)
+    for i in range(2):
+        # Row i of each rotated lobe, i.e. (lobes x size)
+        rows = rotations[:, i, 0, None] * lobe[0]
+        rows += rotations[:, i, 1, None] * lobe[1]
+        out[i] = rows.ravel()[:n]
+    return out
+
+
 class Spirograph:
 
     @staticmethod
-    def trajectory(l_r: float, k_r: float, t: NDArray) -> NDArray:
+    def trajectory(
+        l_r: float | NDArray,
+        k_r: float | NDArray,
+        t: NDArray,
+        method: str = "direct",
+        workers: int | None = 1,
+    ) -> NDArray:
         """
         Calculate spirograph trajectory
 
         Parameters
         ----------
-        l_r : float
+        l_r : float | NDArray
             Ratio between drawing point on smaller circle and radius of
             smaller circle (rho/r), physically must be smaller than 1.
-        k_r : float
+            An array gives one ratio per angle of t.
+        k_r : float | NDArray
             Ratio between radius of small circle
             to stationary circle (r/R, R=1).
+            An array gives one ratio per angle of t.
         t : NDArray
             Discretization of angle t.
+        method : str
+            "direct" evaluates the trigonometric functions at every
+            angle, "recurrence" rotates the two circles by complex
+            products and requires a uniform discretization and
+            scalar ratios, see `recurrence_circles`. "symmetry"
+            evaluates a single lobe and rotates it, it requires a
+            rational k_r (see `symmetry`) and a uniform
+            discretization with a whole number of samples per lobe.
+        workers : int | None
+            Number of threads evaluating chunks of a one dimensional
+            t with the direct method, None for the number of CPUs.
+            The result is identical to the one of a single thread,
+            the other methods require a single worker.
 
         Returns
         -------
         NDArray : Spirograph trajectory of shape (3xn) since
         homogeneous coordinates are used.
         """
+        with profiling.stage("trajectory", np.size(t)):
+            return Spirograph._trajectory(l_r, k_r, t, method, workers)
+
+    @staticmethod
+    def _trajectory(
+        l_r: float | NDArray,
+        k_r: float | NDArray,
+        t: NDArray,
+        method: str = "direct",
+        workers: int | None = 1,
+    ) -> NDArray:
+        """Uninstrumented `trajectory`, also used for its chunks."""
+        if method in ("recurrence", "symmetry"):
+            if np.ndim(l_r) or np.ndim(k_r) or np.ndim(t) != 1:
+                raise ValueError(f"{method.title()} requires scalar ratios.")
+            if workers != 1:
+                raise ValueError(f"{method.title()} requires a single worker.")
+            out = np.ones((3, t.shape[0]))
+            if method == "recurrence":
+                # The pen is the sum of the rolling circle center
+                # and of the pen arm turning backwards
+                radius = np.array([1 - k_r, l_r * k_r])
+                speed = np.array([1, -(1 - k_r) / k_r])
+                result = recurrence_circles(
+                    radius, speed, np.zeros(2), t, out[:2]
+                )
+            else:
+
+                def lobe(time: NDArray) -> NDArray:
+                    return Spirograph._trajectory(l_r, k_r, time)[:2]
+
+                symmetry = Spirograph.symmetry(float(k_r))
+                result = None
+                if symmetry is not None:
+                    result = rotational_symmetry(
+                        lobe, t, *symmetry, out=out[:2]
+                    )
+            if result is None:
+                raise ValueError(
+                    f"{method.title()} requires a uniform t"
+                    + (" and a rational k_r." if method == "symmetry" else ".")
+                )
+            return out
+        if method != "direct":
+            raise ValueError(f"Unknown method {method!r}.")
+        if workers != 1 and np.ndim(t) == 1:
+            out = np.empty((3, t.shape[0]), dtype=np.result_type(l_r, k_r, t))
+            l_a, k_a = np.asarray(l_r), np.asarray(k_r)
+
+            def evaluate(start: int, stop: int) -> None:
+                chunk = slice(start, stop)
+                out[:, chunk] = Spirograph._trajectory(
+                    l_a[chunk] if l_a.ndim else l_a,
+                    k_a[chunk] if k_a.ndim else k_a,
+                    t[chunk],
+                )
+
+            # Deferred so that importing the module does not load
+            # the thread pool
+            # pylint: disable-next=import-outside-toplevel
+            from project.core.parallel import map_chunks
+
+            map_chunks(evaluate, t.shape[0], workers)
+            return out
         xp = (1 - k_r) * np.cos(t) + l_r * k_r * np.cos((1 - k_r) / k_r * t)
         yp = (1 - k_r) * np.sin(t) - l_r * k_r * np.sin((1 - k_r) / k_r * t)
         return np.stack([xp, yp, np.ones_like(t)])
 
+    @staticmethod
+    def symmetry(
+        k_r: float, tol: float = 1e-9, max_denominator: int = 10**4
+    ) -> tuple[float, float] | None:
+        """
+        Find the rotational symmetry of a spirograph.
+
+        If k_r is the irreducible fraction p/q the curve closes after
+        t = 2*pi*p and is made of q lobes, each lobe is the previous
+        one rotated by 2*pi*p/q after an angle t of 2*pi*p/q. With M
+        samples per lobe, the discretization
+        np.linspace(ti, ti + 2*pi*p, q*M + 1) covers the closed curve
+        with whole lobes.
+
+        Parameters
+        ----------
+        k_r : float
+            Ratio between radius of small circle
+            to stationary circle (r/R, R=1).
+        tol : float
+            Maximum relative error of the rational approximation of k_r.
+        max_denominator : int
+            Maximum number of lobes.
+
+        Returns
+        -------
+        tuple[float, float] | None : Angle t between two lobes
+        and rotation between them, None if k_r is not rational.
+        """
+        fraction = Fraction(float(k_r)).limit_denominator(max_denominator)
+        if fraction == 0 or abs(fraction - k_r) > tol * abs(k_r):
+            return None
+        period = 2 * np.pi * fraction.numerator / fraction.denominator
+        return period, period
+
+    @staticmethod
+    def rolling_circle(k_r: float, t: NDArray) -> NDArray:
+        """
+        Calculate the trajectory of the center of the rolling circle.
+
+        Parameters
+        ----------
+        k_r : float
+            Ratio between radius of small circle
+            to stationary circle (r/R, R=1).
+        t : NDArray
+            Discretization of angle t.
+
+        Returns
+        -------
+        NDArray : Center trajectory of shape (3xn) since
+        homogeneous coordinates are used.
+        """
+        return np.stack(
+            [(1 - k_r) * np.cos(t), (1 - k_r) * np.sin(t), np.ones_like(t)]
+        )
+
+    @staticmethod
+    def derivative(
+        l_r: float, k_r: float, t: NDArray, order: int = 1
+    ) -> NDArray:
+        """
+        Calculate the derivative of the spirograph trajectory
+        with respect to t.
+
+        Parameters
+        ----------
+        l_r : float
+            Ratio rho/r, see `trajectory`.
+        k_r : float
+            Ratio r/R, see `trajectory`.
+        t : NDArray
+            Discretization of angle t.
+        order : int
+            Order of the derivative.
+
+        Returns
+        -------
+        NDArray : Derivative of shape (3xn), the last row is zero
+        since the derivative is a direction in homogeneous coordinates.
+        """
+        c = (1 - k_r) / k_r
+        a = 1 - k_r
+        b = l_r * k_r * c**order
+        # Each derivative rotates the phase of a term by pi/2
+        phase = order * np.pi / 2
+        with profiling.stage("trajectory", np.size(t)):
+            xp = a * np.cos(t + phase) + b * np.cos(c * t + phase)
+            yp = a * np.sin(t + phase) - b * np.sin(c * t + phase)
+            return np.stack([xp, yp, np.zeros_like(t)])
+
+    @staticmethod
+    def trajectories(l_r: NDArray, k_r: NDArray, t: NDArray) -> NDArray:
+        """
+        Calculate many spirograph trajectories at once.
+
+        Parameters
+        ----------
+        l_r : NDArray
+            Ratios rho/r of shape (P,), see `trajectory`.
+        k_r : NDArray
+            Ratios r/R of shape (P,), see `trajectory`.
+        t : NDArray
+            Discretization of angle t, either of shape (n,) shared by
+            all the curves or of shape (Pxn) with one row per curve.
+
+        Returns
+        -------
+        NDArray : Spirograph trajectories of shape (Px3xn) since
+        homogeneous coordinates are used.
+        """
+        l_r = np.asarray(l_r, dtype=np.float64).reshape(-1, 1)
+        k_r = np.asarray(k_r, dtype=np.float64).reshape(-1, 1)
+        t = np.asarray(t, dtype=np.float64)
+        if t.ndim not in (1, 2):
+            raise ValueError("t must be of shape (n,) or (Pxn).")
+
+        a = 1 - k_r
+        b = l_r * k_r
+        # cos(t) and sin(t) are shared by all curves when t is shared
+        cos_t = np.cos(t)
+        sin_t = np.sin(t)
+        ct = (a / k_r) * t
+
+        out = np.empty((l_r.shape[0], 3, t.shape[-1]), dtype=np.float64)
+        np.multiply(a, cos_t, out=out[:, 0])
+        np.multiply(a, sin_t, out=out[:, 1])
+        out[:, 0] += b * np.cos(ct)
+        out[:, 1] -= b * np.sin(ct)
+        out[:, 2] = 1.0
+        return out
+
+    @staticmethod
+    def trajectories_ragged(
+        l_r: NDArray, k_r: NDArray, t: list[NDArray]
+    ) -> tuple[NDArray, NDArray]:
+        """
+        Calculate many spirograph trajectories with
+        a different number of samples each.
+
+        Parameters
+        ----------
+        l_r : NDArray
+            Ratios rho/r of shape (P,), see `trajectory`.
+        k_r : NDArray
+            Ratios r/R of shape (P,), see `trajectory`.
+        t : list[NDArray]
+            Discretizations of angle t, one array of shape (n_i,)
+            per curve.
+
+        Returns
+        -------
+        NDArray : Concatenated trajectories of shape (3xN),
+        with N the total number of samples.
+        NDArray : Offsets of shape (P+1,), curve i is stored in
+        columns offsets[i]:offsets[i+1].
+        """
+        lengths = np.array([len(t_i) for t_i in t], dtype=np.int64)
+        offsets = np.zeros(len(t) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        t_all = np.concatenate(t) if len(t) else np.empty((0,))
+        l_all = np.repeat(np.asarray(l_r, dtype=np.float64), lengths)
+        k_all = np.repeat(np.asarray(k_r, dtype=np.float64), lengths)
+        return Spirograph.trajectory(l_all, k_all, t_all), offsets
+
     @staticmethod
     def angles(ti: float, tf: float, steps: int) -> NDArray:
         """
@@ -71,21 +503,208 @@ class Spirograph:
         """
         return np.linspace(ti, tf, steps)
 
+    @staticmethod
+    def adaptive_angles(
+        l_r: float,
+        k_r: float,
+        ti: float,
+        tf: float,
+        tol: float = 1e-3,
+        fine_steps: int | None = None,
+    ) -> NDArray:
+        """
+        Calculate spirograph angles discretization from a
+        chord error tolerance instead of a fixed number of steps.
+
+        Parameters
+        ----------
+        l_r : float
+            Ratio rho/r, see `trajectory`.
+        k_r : float
+            Ratio r/R, see `trajectory`.
+        ti : float
+            Initial angle t.
+        tf : float
+            Final angle t.
+        tol : float
+            Maximum distance between the sampled polyline and
+            the curve, relative to the stationary circle radius.
+        fine_steps : int | None
+            Number of steps used to integrate the sample density,
+            by default 64 per revolution of the fastest term.
+
+        Returns
+        -------
+        NDArray : Discretization of angle t.
+        """
+        if fine_steps is None:
+            speed = max(1.0, abs((1 - k_r) / k_r))
+            turns = abs(tf - ti) * speed / (2 * np.pi)
+            fine_steps = max(1024, int(64 * turns))
+        t = np.linspace(ti, tf, fine_steps)
+        return bezier.chord_error_samples(
+            t, Spirograph.derivative(l_r, k_r, t, 2), tol
+        )
+
+    @staticmethod
+    def bezier(
+        l_r: float, k_r: float, ti: float, tf: float, tol: float = 1e-3
+    ) -> NDArray:
+        """
+        Approximate the spirograph trajectory by cubic Bezier curves
+        with spans chosen from an error tolerance, see `bezier_spans`.
+
+        Parameters
+        ----------
+        l_r : float
+            Ratio rho/r, see `trajectory`.
+        k_r : float
+            Ratio r/R, see `trajectory`.
+        ti : float
+            Initial angle t.
+        tf : float
+            Final angle t.
+        tol : float
+            Maximum distance between the Bezier curves and
+            the curve, relative to the stationary circle radius.
+
+        Returns
+        -------
+        NDArray : Control points of shape (3x(3k+1)) for k spans.
+        """
+        t = bezier.revolution_knots(ti, tf, max(1.0, abs((1 - k_r) / k_r)))
+        return bezier.bezier_spans(
+            lambda t: Spirograph.trajectory(l_r, k_r, t),
+            lambda t: Spirograph.derivative(l_r, k_r, t),
+            t,
+            tol,
+        )
+
 
 class Transform:
     """
     Class used to perform transformations on an array of points.
 
+    The transformations are composed into a single affine matrix
+    and only applied to the points when the result is requested.
+
     Attributes
     ----------
     a : NDArray
         Input array, must be of shape (3xn) since
         homogeneous coordinates are used.
+    copy : bool
+        If True the input array is copied, an array returned by `a`
+        is never changed by later transformations. If False the
+        result is written in place into the input array when it is
+        of floating point type.
     """
 
-    def __init__(self, a: NDArray) -> None:
+    def __init__(self, a: NDArray, copy: bool = True) -> None:
+        self.copy = copy
+        self._a, self._writable = self._own(a)
+        self._matrix = np.eye(3)
+        self._pending = False
+
+    @property
+    def a(self) -> NDArray:
+        if self._pending:
+            self._a = self.apply(self._a if self._writable else None)
+            self._matrix = np.eye(3)
+            self._pending = False
+        # Once returned, a copy belongs to the caller and later
+        # transformations are written into a new array
+        self._writable = not self.copy and np.issubdtype(
+            self._a.dtype, np.floating
+        )
+        return self._a
+
+    @a.setter
+    def a(self, value: NDArray) -> None:
+        self._a, self._writable = self._own(value)
+        self._matrix = np.eye(3)
+        self._pending = False
+
+    def _own(self, a: NDArray) -> tuple[NDArray, bool]:
+        """
+        Return the array holding the points, copied unless copy is
+        False, and whether the transformations may be written into it.
+        """
         Transform.check_input(a)
-        self.a = np.copy(a)
+        if self.copy:
+            a = np.array(a, dtype=np.result_type(a, np.float64))
+        return a, bool(np.issubdtype(a.dtype, np.floating))
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Shape of the input array, without applying the transformations."""
+        return self._a.shape
+
+    @property
+    def matrix(self) -> NDArray:
+        """Affine matrix composing the pending transformations."""
+        return self._matrix
+
+    def apply(
+        self, out: NDArray | None = None, chunk_size: int = 2**16
+    ) -> NDArray:
+        """
+        Apply the pending transformations to the input array
+        in a single pass.
+
+        Parameters
+        ----------
+        out : NDArray | None
+            Optional floating point output array of shape (3xn),
+            may be the input array itself, the pending
+            transformations are then consumed.
+        chunk_size : int
+            Number of points transformed at once, bounds
+            the size of the temporaries.
+
+        Returns
+        -------
+        NDArray
+            Output array of shape (3xn) since
+            homogeneous coordinates are used.
+        """
+        if out is None:
+            out = np.empty(
+                self._a.shape, dtype=np.result_type(self._a, np.float64)
+            )
+        elif not np.issubdtype(out.dtype, np.floating):
+            raise ValueError("Output array must be of floating point type.")
+        with profiling.stage("transform", self._a.shape[1]):
+            for start, chunk in zip(
+                range(0, self._a.shape[1], chunk_size),
+                self.chunks(chunk_size),
+            ):
+                out[:, start : start + chunk_size] = chunk
+        if np.shares_memory(out, self._a):
+            # The input now holds the result, the transformations
+            # must not be applied to it a second time
+            self._matrix = np.eye(3)
+            self._pending = False
+        return out
+
+    def chunks(self, chunk_size: int = 2**16) -> Iterator[NDArray]:
+        """
+        Apply the pending transformations to the input array
+        one chunk of points at a time.
+
+        Parameters
+        ----------
+        chunk_size : int
+            Number of points per chunk.
+
+        Yields
+        ------
+        NDArray
+            Transformed chunk of shape (3xchunk_size),
+            the last chunk may be shorter.
+        """
+        for start in range(0, self._a.shape[1], chunk_size):
+            yield self._matrix @ self._a[:, start : start + chunk_size]
 
     def translate(self, tx: float, ty: float) -> "Transform":
         """
@@ -101,7 +720,8 @@ class Transform:
         --------
         _translate : Contains attribute definitions.
         """
-        self.a = Transform._translate(self.a, tx, ty)
+        self._matrix = Transform._translate(self._matrix, tx, ty)
+        self._pending = True
         return self
 
     def rotate(self, r: float) -> "Transform":
@@ -118,7 +738,8 @@ class Transform:
         --------
         _rotate : Contains attribute definitions.
         """
-        self.a = Transform._rotate(self.a, r)
+        self._matrix = Transform._rotate(self._matrix, r)
+        self._pending = True
         return self
 
     def scale(self, sx: float, sy: float) -> "Transform":
@@ -135,7 +756,8 @@ class Transform:
         --------
         _scale : Contains attribute definitions.
         """
-        self.a = Transform._scale(self.a, sx, sy)
+        self._matrix = Transform._scale(self._matrix, sx, sy)
+        self._pending = True
         return self
 
     def rotate_p(self, r: float, px: float, py: float) -> "Transform":
@@ -153,7 +775,8 @@ class Transform:
         --------
         _rotate_p : Contains attribute definitions.
         """
-        self.a = Transform._rotate_p(self.a, r, px, py)
+        self._matrix = Transform._rotate_p(self._matrix, r, px, py)
+        self._pending = True
         return self
 
     def scale_p(
@@ -173,7 +796,8 @@ class Transform:
         --------
         _scale_p : Contains attribute definitions.
         """
-        self.a = Transform._scale_p(self.a, sx, sy, px, py)
+        self._matrix = Transform._scale_p(self._matrix, sx, sy, px, py)
+        self._pending = True
         return self
 
     @staticmethod
@@ -319,6 +943,11 @@ class Transform:
 
 
 if __name__ == "__main__":
+    # Plotting is only needed by this demo, so it is not imported
+    # by the users of the module
+    import matplotlib.animation as animation
+    import matplotlib.pyplot as plt
+
     # polygon = n_polygon(3)
     # polygon = Transform.rotate(polygon, np.pi / 4)
     # polygon = Transform.translate(polygon, 1, 2)
@@ -338,8 +967,7 @@ if __name__ == "__main__":
     # plt.gca().set_aspect("equal", adjustable="box")
     # plt.show()
 
-    c_x = (1 - k_r) * np.cos(t)
-    c_y = (1 - k_r) * np.sin(t)
+    c_x, c_y, _ = Spirograph.rolling_circle(k_r, t)
 
     c1 = plt.Circle((0, 0), 1, fill=False)
     c2 = plt.Circle((c_x[0], c_y[0]), k_r, fill=False)
@@ -0,0 +1,122 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from project.core import profiling
+
+
+class LODPyramid:
+    """
+    Multi-resolution decimation pyramid of a trajectory.
+
+    Each level splits the samples into buckets and only keeps, for
+    each bucket, its first and last samples and the samples with the
+    extreme x and y coordinates, so the shape and the extent of the
+    curve are preserved at every level.
+
+    Attributes
+    ----------
+    a : NDArray
+        Full resolution trajectory of shape (3xn) since
+        homogeneous coordinates are used.
+    levels : list[NDArray | None]
+        Sorted indices of the samples kept at each level,
+        None for the full resolution level 0.
+    spans : list[float]
+        Longest arc length covered by a bucket at each level.
+    """
+
+    def __init__(
+        self, a: NDArray, factor: int = 4, min_buckets: int = 64
+    ) -> None:
+        self.a = a
+        n = a.shape[1]
+        self.levels: list[NDArray | None] = [None]
+        with profiling.stage("lod", n):
+            steps = np.hypot(np.diff(a[0]), np.diff(a[1]))
+            arc = np.zeros(n)
+            np.cumsum(steps, out=arc[1:])
+
+            self.spans: list[float] = [float(steps.max(initial=0.0))]
+            bucket = 4 * factor
+            while n // bucket >= min_buckets:
+                indices, span = LODPyramid._decimate(a, arc, bucket)
+                self.levels.append(indices)
+                self.spans.append(span)
+                bucket *= factor
+
+    def select(self, pixel_size: float) -> int:
+        """
+        Select the coarsest level whose buckets
+        span at most one pixel.
+
+        Parameters
+        ----------
+        pixel_size : float
+            Size of a pixel in the units of the trajectory.
+
+        Returns
+        -------
+        int : Level index.
+        """
+        level = 0
+        for i, span in enumerate(self.spans):
+            if span <= pixel_size:
+                level = i
+        return level
+
+    def points(self, stop: int, pixel_size: float) -> NDArray:
+        """
+        Return the samples before stop at the level
+        matching the pixel size.
+
+        Parameters
+        ----------
+        stop : int
+            Number of samples of the full resolution trajectory shown.
+        pixel_size : float
+            Size of a pixel in the units of the trajectory.
+
+        Returns
+        -------
+        NDArray : Decimated trajectory of shape (3xk).
+        """
+        indices = self.levels[self.select(pixel_size)]
+        if indices is None or stop <= 0:
+            return self.a[:, :stop]
+        indices = indices[: np.searchsorted(indices, stop)]
+        # The curve must end exactly at the last shown sample
+        if not indices.shape[0] or indices[-1] != stop - 1:
+            indices = np.append(indices, stop - 1)
+        return self.a[:, indices]
+
+    @staticmethod
+    def _decimate(
+        a: NDArray, arc: NDArray, bucket: int
+    ) -> tuple[NDArray, float]:
+        """Keep first, last and extreme samples of each bucket."""
+        n = a.shape[1]
+        buckets = -(-n // bucket)
+        start = np.arange(buckets) * bucket
+        last = np.minimum(start + bucket - 1, n - 1)
+
+        # Padding repeats the last sample so it never changes the extremes
+        x = np.pad(a[0], (0, buckets * bucket - n), mode="edge")
+        y = np.pad(a[1], (0, buckets * bucket - n), mode="edge")
+        x = x.reshape(buckets, bucket)
+        y = y.reshape(buckets, bucket)
+        keep = np.stack(
+            [
+                start,
+                last,
+                start + np.argmin(x, axis=1),
+                start + np.argmax(x, axis=1),
+                start + np.argmin(y, axis=1),
+                start + np.argmax(y, axis=1),
+            ],
+            axis=1,
+        )
+        np.minimum(keep, n - 1, out=keep)
+        keep.sort(axis=1)
+        keep = keep.ravel()
+        keep = keep[np.concatenate([[True], keep[1:] != keep[:-1]])]
+        return keep, float(np.max(arc[last] - arc[start]))
@@ -0,0 +1,50 @@
+"""Module for the evaluation of large arrays on a thread pool."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+MIN_CHUNK = 2**14
+
+
+def map_chunks(
+    func: Callable[[int, int], None],
+    n: int,
+    workers: int | None = 1,
+    min_chunk: int = MIN_CHUNK,
+) -> None:
+    """
+    Call a function over consecutive chunks of samples on a thread pool.
+
+    The function is expected to write the samples start to stop
+    into slices of a preallocated output array, NumPy releases the
+    GIL during the evaluation so the chunks run in parallel. Since
+    each sample only depends on its own inputs the result does not
+    depend on the number of workers.
+
+    Parameters
+    ----------
+    func : Callable[[int, int], None]
+        Function evaluating the samples from start to stop.
+    n : int
+        Number of samples.
+    workers : int | None
+        Number of threads, by default 1 to evaluate all the
+        samples in the calling thread, None for the number of CPUs.
+    min_chunk : int
+        Minimum number of samples per chunk, smaller chunks
+        cost more in overhead than they gain in parallelism.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1.")
+    # A few chunks per worker balance the load between the threads
+    chunks = min(4 * workers, n // min_chunk) if workers > 1 else 1
+    if chunks <= 1:
+        func(0, n)
+        return
+    bounds = [n * i // chunks for i in range(chunks + 1)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consumed so that exceptions of the workers are raised here
+        list(executor.map(func, bounds[:-1], bounds[1:]))
@@ -0,0 +1,248 @@
+"""
+Module for the opt-in timing instrumentation of the render stages.
+
+The instrumented code wraps each stage (trajectory generation,
+transform, encoding, plot upload...) in a `stage` block. While the
+instrumentation is disabled, the default, a stage only costs a
+function call returning a shared no-op context manager.
+"""
+
+import threading
+import time
+from typing import Any
+
+_enabled = False
+_memory = False
+# Whether tracemalloc was started by `enable`, a tracing started by
+# the caller is left running by `disable`
+_tracing = False
+_stages: dict[str, "Stage"] = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Stage:
+    """
+    Statistics accumulated by the calls of a stage.
+
+    Attributes
+    ----------
+    calls : int
+        Number of calls.
+    time : float
+        Total wall time in seconds.
+    samples : int
+        Total number of samples processed.
+    bytes : int
+        Largest memory peak of a call in bytes,
+        only tracked if enabled with memory=True.
+    last : float
+        Wall time of the last call in seconds.
+    """
+
+    __slots__ = ("calls", "time", "samples", "bytes", "last")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.time = 0.0
+        self.samples = 0
+        self.bytes = 0
+        self.last = 0.0
+
+
+class _Null:
+    """Context manager of the stages while the instrumentation is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL = _Null()
+
+
+class _Record:
+    """Context manager measuring a single call of a stage."""
+
+    __slots__ = ("name", "samples", "start", "base", "peak", "nested")
+
+    def __init__(self, name: str, samples: int) -> None:
+        self.name = name
+        self.samples = samples
+        self.base = 0
+        self.peak = 0
+        self.nested = False
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        stack = _stack()
+        # A stage calling itself, e.g. by recursion, is counted once
+        self.nested = any(record.name == self.name for record in stack)
+        stack.append(self)
+        if _memory:
+            # pylint: disable-next=import-outside-toplevel
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is reset for this stage, the enclosing
+            # stages keep the peak reached so far
+            for record in stack:
+                record.peak = max(record.peak, peak)
+            tracemalloc.reset_peak()
+            self.base = current
+            self.peak = current
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.start
+        stack = _stack()
+        stack.pop()
+        allocated = 0
+        if _memory:
+            # pylint: disable-next=import-outside-toplevel
+            import tracemalloc
+
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            allocated = peak - self.base
+            for record in stack:
+                record.peak = max(record.peak, peak)
+        if self.nested:
+            return
+        with _lock:
+            stage = _stages.setdefault(self.name, Stage())
+            stage.calls += 1
+            stage.time += elapsed
+            stage.samples += self.samples
+            stage.bytes = max(stage.bytes, allocated)
+            stage.last = elapsed
+
+
+def _stack() -> list[_Record]:
+    """Stages currently measured by this thread."""
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def enable(memory: bool = False) -> None:
+    """
+    Start recording the stages.
+
+    Parameters
+    ----------
+    memory : bool
+        Also record the memory peak of the stages with tracemalloc,
+        which slows down the allocations.
+    """
+    global _enabled, _memory, _tracing  # pylint: disable=global-statement
+    if memory:
+        # pylint: disable-next=import-outside-toplevel
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing = True
+    _enabled = True
+    _memory = memory
+
+
+def disable() -> None:
+    """Stop recording the stages, the statistics are kept."""
+    global _enabled, _memory, _tracing  # pylint: disable=global-statement
+    if _tracing:
+        # pylint: disable-next=import-outside-toplevel
+        import tracemalloc
+
+        tracemalloc.stop()
+        _tracing = False
+    _enabled = False
+    _memory = False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Clear the recorded statistics."""
+    with _lock:
+        _stages.clear()
+
+
+def stage(name: str, samples: int = 0) -> "_Record | _Null":
+    """
+    Measure a stage in a with block.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage.
+    samples : int
+        Number of samples processed by the stage.
+
+    Returns
+    -------
+    _Record | _Null : Context manager measuring the block,
+    a shared no-op one if the instrumentation is disabled.
+    """
+    if not _enabled:
+        return _NULL
+    return _Record(name, samples)
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """
+    Return a copy of the recorded statistics, e.g. to send
+    them from a worker process to be merged.
+
+    Returns
+    -------
+    dict[str, dict[str, float]] : Statistics of each stage,
+    see `Stage` for the fields.
+    """
+    with _lock:
+        return {
+            name: {field: getattr(stage, field) for field in Stage.__slots__}
+            for name, stage in _stages.items()
+        }
+
+
+def merge(other: dict[str, dict[str, float]]) -> None:
+    """Add the statistics returned by `stats`, e.g. by another process."""
+    with _lock:
+        for name, values in other.items():
+            stage = _stages.setdefault(name, Stage())
+            stage.calls += int(values["calls"])
+            stage.time += values["time"]
+            stage.samples += int(values["samples"])
+            stage.bytes = max(stage.bytes, int(values["bytes"]))
+            stage.last = values["last"]
+
+
+def summary() -> str:
+    """Format the recorded statistics as a table, slowest stage first."""
+    lines = [
+        f"{'stage':<12} {'calls':>7} {'total':>12} {'per call':>12} "
+        f"{'samples/s':>12} {'peak':>10}"
+    ]
+    for name, values in sorted(
+        stats().items(), key=lambda item: -item[1]["time"]
+    ):
+        elapsed = values["time"]
+        throughput = values["samples"] / elapsed if elapsed else 0.0
+        # Without memory tracking no peak is recorded
+        peak = (
+            f"{values['bytes'] / 2**20:>6.1f} MiB" if values["bytes"] else ""
+        )
+        lines.append(
+            f"{name:<12} {values['calls']:>7} {elapsed * 1000:>9.2f} ms "
+            f"{elapsed * 1000 / values['calls']:>9.3f} ms "
+            f"{throughput:>12.3e} {peak:>10}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,210 @@
+import os
+import struct
+import zlib
+from typing import IO, Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from project.core import profiling
+from project.core.geometry import Transform
+
+CHUNK_SIZE = 2**16
+# Maximum number of (subsample, pen subpixel) pairs tested at once
+BATCH_SIZE = 2**20
+
+
+class Rasterizer:
+    @staticmethod
+    def rasterize(
+        a: NDArray,
+        width: int = 256,
+        height: int | None = None,
+        line_width: float = 1.0,
+        supersample: int = 4,
+        extent: tuple[float, float, float, float] | None = (-1, 1, -1, 1),
+        chunk_size: int = CHUNK_SIZE,
+    ) -> NDArray:
+        """
+        Rasterize an array of points as an anti-aliased polyline.
+
+        The polyline is drawn on a grid supersampled in both
+        directions, each pixel of the output is the fraction of its
+        subpixels covered by the line.
+
+        Parameters
+        ----------
+        a : NDArray
+            Input array, must be of shape (3xn) since
+            homogeneous coordinates are used.
+        width : int
+            Width of the image in pixels.
+        height : int | None
+            Height of the image in pixels, by default equal to width.
+        line_width : float
+            Width of the line in pixels.
+        supersample : int
+            Number of subpixels per pixel in each direction.
+        extent : tuple[float, float, float, float] | None
+            Region (xmin, xmax, ymin, ymax) mapped to the image,
+            by default the unit circle of the spirographs. If None
+            the bounding box of the points is used.
+        chunk_size : int
+            Number of segments subdivided at once, the subsamples
+            are then drawn in batches of bounded size.
+
+        Returns
+        -------
+        NDArray : Coverage of shape (height x width) in [0, 1].
+        """
+        Transform.check_input(a)
+        height = width if height is None else height
+        if extent is None:
+            extent = (
+                float(a[0].min()),
+                float(a[0].max()),
+                float(a[1].min()),
+                float(a[1].max()),
+            )
+        xmin, xmax, ymin, ymax = extent
+        # Equal scale on both axes, centered in the image
+        scale = supersample * min(
+            width / max(xmax - xmin, 1e-12), height / max(ymax - ymin, 1e-12)
+        )
+        cols = width * supersample
+        rows = height * supersample
+        transform = (
+            Transform(a, copy=False)
+            .translate(-(xmin + xmax) / 2, -(ymin + ymax) / 2)
+            .scale(scale, -scale)
+            .translate(cols / 2, rows / 2)
+        )
+
+        # Candidate subpixels around a point, kept if their center
+        # lies within the pen radius
+        radius = max(line_width * supersample / 2, 0.5)
+        r = int(np.ceil(radius))
+        pen_y, pen_x = np.mgrid[-r : r + 1, -r : r + 1].reshape(2, -1)
+
+        with profiling.stage("rasterize", a.shape[1]):
+            grid = np.zeros((rows, cols), dtype=bool)
+            previous = None
+            for chunk in transform.chunks(chunk_size):
+                if previous is not None:
+                    chunk = np.concatenate([previous, chunk], axis=1)
+                previous = chunk[:, -1:]
+                # Long segments have many subsamples, the batches bound
+                # the temporaries whatever the length of the segments
+                for x, y in Rasterizer._sample_segments(
+                    chunk[0], chunk[1], batch=BATCH_SIZE // pen_x.shape[0]
+                ):
+                    ix = np.floor(x).astype(np.int64)[:, None] + pen_x
+                    iy = np.floor(y).astype(np.int64)[:, None] + pen_y
+                    inside = (ix + 0.5 - x[:, None]) ** 2 + (
+                        iy + 0.5 - y[:, None]
+                    ) ** 2 <= radius**2
+                    inside &= (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+                    grid[iy[inside], ix[inside]] = True
+
+            return grid.reshape(height, supersample, width, supersample).mean(
+                axis=(1, 3)
+            )
+
+    @staticmethod
+    def _sample_segments(
+        x: NDArray, y: NDArray, step: float = 0.5, batch: int = 2**16
+    ) -> Iterator[tuple[NDArray, NDArray]]:
+        """
+        Sample the segments of a polyline every step subpixels,
+        yielding the subsamples in batches of at most batch of them.
+        """
+        if x.shape[0] < 2:
+            yield x, y
+            return
+        dx = np.diff(x)
+        dy = np.diff(y)
+        counts = np.maximum(np.ceil(np.hypot(dx, dy) / step), 1).astype(
+            np.int64
+        )
+        ends = np.cumsum(counts)
+        # The last point of the polyline is one more subsample
+        total = int(ends[-1]) + 1
+        batch = max(batch, 1)
+        for start in range(0, total, batch):
+            index = np.arange(start, min(start + batch, total))
+            segment = np.minimum(
+                np.searchsorted(ends, index, side="right"), counts.shape[0] - 1
+            )
+            u = (index - (ends[segment] - counts[segment])) / counts[segment]
+            yield x[segment] + u * dx[segment], y[segment] + u * dy[segment]
+
+    @staticmethod
+    def grayscale(coverage: NDArray) -> NDArray:
+        """Black line on a white background, as 8 bit grayscale."""
+        return (255 - np.rint(255 * coverage)).astype(np.uint8)
+
+    @staticmethod
+    def rgba(
+        coverage: NDArray, color: tuple[int, int, int] = (0, 0, 0)
+    ) -> NDArray:
+        """Colored line on a transparent background, as 8 bit RGBA."""
+        image = np.empty(coverage.shape + (4,), dtype=np.uint8)
+        image[..., :3] = color
+        image[..., 3] = np.rint(255 * coverage)
+        return image
+
+    @staticmethod
+    def encode_png(image: NDArray) -> bytes:
+        """
+        Encode an 8 bit image as PNG.
+
+        Parameters
+        ----------
+        image : NDArray
+            Image of shape (height x width) for grayscale
+            or (height x width x 4) for RGBA.
+
+        Returns
+        -------
+        bytes : PNG file content.
+        """
+        if image.ndim == 2:
+            color_type = 0
+        elif image.ndim == 3 and image.shape[2] == 4:
+            color_type = 6
+        else:
+            raise ValueError("Image must be of shape (hxw) or (hxwx4).")
+        height, width = image.shape[:2]
+        # Each row starts with the filter type, 0 for no filter
+        rows = image.astype(np.uint8).reshape(height, -1)
+        raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows])
+
+        def chunk(kind: bytes, data: bytes) -> bytes:
+            return (
+                struct.pack(">I", len(data))
+                + kind
+                + data
+                + struct.pack(">I", zlib.crc32(kind + data))
+            )
+
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(
+                b"IHDR",
+                struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0),
+            )
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + chunk(b"IEND", b"")
+        )
+
+    @staticmethod
+    def write_png(
+        image: NDArray, f: "str | os.PathLike[str] | IO[bytes]"
+    ) -> None:
+        """Write an 8 bit image as PNG to a path or binary file object."""
+        data = Rasterizer.encode_png(image)
+        if isinstance(f, (str, os.PathLike)):
+            with open(f, "wb") as out:
+                out.write(data)
+        else:
+            f.write(data)
@@ -1,31 +1,218 @@
+import gzip
+import html
+import io
+import os
+import re
+from contextlib import ExitStack, contextmanager
+from typing import IO, Any, Iterable, Iterator
+
+import numpy as np
 from numpy.typing import NDArray
 
+from project.core import profiling
 from project.core.geometry import Transform
 
+CHUNK_SIZE = 2**16
+# Trailing zeros of the decimals and leading zeros of the fractions
+TRAILING_ZEROS = re.compile(r"\.?0+(?= |$)")
+LEADING_ZERO = re.compile(r"(?<!\d)0(?=\.)")
+
 
 class SVGEncoder:
     @staticmethod
     def encode_path(
-        a: NDArray, size: float = 10.0, padding: float = 0.5
+        a: NDArray,
+        size: float = 10.0,
+        padding: float = 0.5,
+        decimals: int | None = None,
+        bezier: bool = False,
     ) -> str:
-        arr = Transform(a).translate(1, 1).scale(50 * size, 50 * size).a
+        """
+        Encode an array of points as a standalone SVG document.
 
-        out = ""
-        out += SVGEncoder.header(size, size, padding)
+        See Also
+        --------
+        write_path : Contains attribute definitions.
+        """
+        buffer = io.StringIO()
+        SVGEncoder.write_path(
+            a, buffer, size, padding, decimals=decimals, bezier=bezier
+        )
+        return buffer.getvalue()
 
-        path = f"\n    M {arr[0, 0]} {arr[1, 0]} \n"
-        for i in range(1, arr.shape[1]):
-            path += f"    L {arr[0, i]} {arr[1, i]} \n"
+    @staticmethod
+    def write_path(
+        a: NDArray,
+        f: "str | os.PathLike[str] | IO[str]",
+        size: float = 10.0,
+        padding: float = 0.5,
+        chunk_size: int = CHUNK_SIZE,
+        decimals: int | None = None,
+        compress: bool | None = None,
+        bezier: bool = False,
+    ) -> None:
+        """
+        Stream an array of points as a standalone SVG document.
 
-        out += (
-            f'  <path d="{path}    "\n'
-            + '        fill="none" stroke="black" stroke-width="1" />\n'
-        )
+        Parameters
+        ----------
+        a : NDArray
+            Input array, must be of shape (3xn) since
+            homogeneous coordinates are used.
+        f : str | PathLike | IO[str]
+            Output path or text file object.
+        size : float
+            Width and height of the drawing in cm.
+        padding : float
+            Padding around the drawing in cm.
+        chunk_size : int
+            Number of points transformed and formatted at once.
+        decimals : int | None
+            If set, the path is written in compact form: coordinates
+            are rounded to this number of decimals, written relative
+            to the previous point with implicit commands, and points
+            identical after rounding are dropped. By default the
+            points are written at full precision as absolute commands.
+        compress : bool | None
+            Write a gzip compressed SVG, by default only
+            if the output path ends with .svgz.
+        bezier : bool
+            The points are the control points of cubic Bezier curves,
+            as returned by `Spirograph.bezier`, written as C commands.
+        """
+        Transform.check_input(a)
+        with SVGDocument(
+            f, size, size, padding, compress, chunk_size, decimals
+        ) as document:
+            document.add_path(
+                Transform(a, copy=False)
+                .translate(1, 1)
+                .scale(50 * size, 50 * size),
+                bezier=bezier,
+                fill="none",
+                stroke="black",
+                stroke_width=1,
+            )
 
-        out += "</svg>\n"
+    @staticmethod
+    def _format_points(arr: NDArray, first: bool) -> str:
+        """Format a chunk of points as path commands in a single pass."""
+        values = arr[:2].T.ravel().tolist()
+        out = ""
+        if first:
+            out += "\n    M %s %s \n" % tuple(values[:2])
+            values = values[2:]
+        out += ("    L %s %s \n" * (len(values) // 2)) % tuple(values)
+        return out
 
+    @staticmethod
+    def _format_bezier(arr: NDArray, first: bool) -> str:
+        """Format a chunk of whole Bezier spans as path commands."""
+        values = arr[:2].T.ravel().tolist()
+        out = ""
+        if first:
+            out += "\n    M %s %s \n" % tuple(values[:2])
+            values = values[2:]
+        out += ("    C %s %s %s %s %s %s \n" * (len(values) // 6)) % tuple(
+            values
+        )
         return out
 
+    @staticmethod
+    def _bezier_chunks(chunks: Iterable[NDArray]) -> Iterator[NDArray]:
+        """
+        Regroup chunks of control points so that, after the first
+        point, each chunk holds whole spans of three points.
+        """
+        pending = np.empty((3, 0))
+        start = 1
+        for chunk in chunks:
+            chunk = np.concatenate([pending, chunk], axis=1)
+            # The first point starts the path, the others come by three
+            stop = chunk.shape[1] - (chunk.shape[1] - start) % 3
+            pending = chunk[:, stop:]
+            if stop:
+                start = 0
+                yield chunk[:, :stop]
+
+    @staticmethod
+    def _write_relative(
+        out: IO[str],
+        chunks: Iterable[NDArray],
+        decimals: int,
+        bezier: bool = False,
+    ) -> None:
+        """
+        Write chunks of points as compact relative path commands,
+        or of whole Bezier spans (see `_bezier_chunks`) if bezier.
+        """
+        scale = 10**decimals
+        previous = None
+        # Written before the first segment, a path collapsed to a
+        # single point after rounding is a lone move command
+        command = "c" if bezier else "l"
+        for chunk in chunks:
+            # Differences are taken on the rounded integer grid,
+            # so rounding errors do not accumulate along the path
+            q = np.rint(chunk[:2] * scale).astype(np.int64)
+            if not q.shape[1]:
+                continue
+            if previous is None:
+                previous = q[:, :1]
+                out.write(
+                    f"\n    M{SVGEncoder._format_fixed(previous, decimals)}"
+                )
+                if bezier:
+                    q = q[:, 1:]
+                    if not q.shape[1]:
+                        # The first chunk only held the start point
+                        continue
+            if bezier:
+                # The controls and the end of a span are relative
+                # to its start, the end of the previous span
+                spans = q.reshape(2, -1, 3)
+                starts = np.concatenate([previous, spans[:, :-1, 2]], axis=1)
+                previous = spans[:, -1:, 2]
+                spans = spans - starts[:, :, None]
+                spans = spans[:, np.any(spans != 0, axis=(0, 2))]
+                d = spans.reshape(2, -1)
+            else:
+                d = np.diff(q, axis=1, prepend=previous)
+                previous = q[:, -1:]
+                d = d[:, np.any(d != 0, axis=0)]
+            if d.shape[1]:
+                out.write(command + SVGEncoder._format_fixed(d, decimals))
+                command = ""
+        out.write("\n")
+
+    @staticmethod
+    def _format_fixed(q: NDArray, decimals: int) -> str:
+        """Format integer grid coordinates with the shortest decimals."""
+        values = (q.T.ravel() / 10**decimals).tolist()
+        text = ((f" %.{decimals}f" * len(values)) % tuple(values))[1:]
+        if decimals:
+            text = TRAILING_ZEROS.sub("", text)
+        return " " + LEADING_ZERO.sub("", text)
+
+    @staticmethod
+    @contextmanager
+    def _open(
+        f: "str | os.PathLike[str] | IO[str]", compress: bool | None = None
+    ) -> Iterator[IO[str]]:
+        if isinstance(f, (str, os.PathLike)):
+            if compress is None:
+                compress = os.fspath(f).lower().endswith(".svgz")
+            if compress:
+                with gzip.open(f, "wt", encoding="utf-8") as out:
+                    yield out
+            else:
+                with open(f, "w", encoding="utf-8") as out:
+                    yield out
+        elif compress:
+            raise ValueError("Compressed output requires a file path.")
+        else:
+            yield f
+
     @staticmethod
     def header(
         width: float = 10.0, height: float = 10.0, padding: float = 0.5
@@ -36,11 +223,259 @@ class SVGEncoder:
             + '  "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">\n'
             + f'<svg width="{width+2*padding}cm" height="{height+2*padding}cm"'
             + f'    viewBox="{-int(padding*100)} {-int(padding*100)} '
-            + f'{int((width+padding)*100)} {int((height+padding)*100)}"\n'
+            + f'{int((width+2*padding)*100)} {int((height+2*padding)*100)}"\n'
             + '     version="1.1" xmlns="http://www.w3.org/2000/svg">\n'
         )
 
 
+class SVGDocument:
+    """
+    Streaming builder of an SVG document made of many paths.
+
+    The header is written when the document is opened and every path
+    is transformed and written chunk by chunk as soon as it is added,
+    so the memory does not depend on the number of paths and the
+    writing time is linear in the total number of points. The user
+    units are hundredths of cm, with the origin at the top left
+    corner of the drawing. The document is written inside a with
+    block, groups are nested with blocks of `group`.
+
+    Attributes
+    ----------
+    f : str | PathLike | IO[str]
+        Output path or text file object.
+    width : float
+        Width of the drawing in cm.
+    height : float
+        Height of the drawing in cm.
+    padding : float
+        Padding around the drawing in cm.
+    compress : bool | None
+        Write a gzip compressed SVG, by default only
+        if the output path ends with .svgz.
+    chunk_size : int
+        Number of points transformed and formatted at once.
+    decimals : int | None
+        Default compact encoding of the paths, see
+        `SVGEncoder.write_path`.
+    attributes : dict[str, Any]
+        Presentation attributes of a group around all the paths,
+        e.g. stroke="black", underscores are written as hyphens.
+    """
+
+    def __init__(
+        self,
+        f: "str | os.PathLike[str] | IO[str]",
+        width: float = 10.0,
+        height: float = 10.0,
+        padding: float = 0.5,
+        compress: bool | None = None,
+        chunk_size: int = CHUNK_SIZE,
+        decimals: int | None = None,
+        **attributes: Any,
+    ) -> None:
+        SVGDocument._check_decimals(decimals)
+        self.f = f
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.decimals = decimals
+        self.attributes = attributes
+        self._out: IO[str] | None = None
+        self._stack = ExitStack()
+        self._depth = 0
+
+    def __enter__(self) -> "SVGDocument":
+        self._out = self._stack.enter_context(
+            SVGEncoder._open(self.f, self.compress)
+        )
+        self._write(SVGEncoder.header(self.width, self.height, self.padding))
+        if self.attributes:
+            self._write(f"  <g{SVGDocument._attributes(self.attributes)}>\n")
+            self._depth = 1
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        # The file is closed even if writing its end fails
+        with self._stack:
+            if exc_type is None:
+                if self.attributes:
+                    self._write("  </g>\n")
+                self._write("</svg>\n")
+        self._out = None
+        self._depth = 0
+
+    def _write(self, text: str) -> None:
+        if self._out is None:
+            raise ValueError("The document must be opened with a with block.")
+        self._out.write(text)
+
+    @contextmanager
+    def group(
+        self, transform: "NDArray | Transform | None" = None, **attributes: Any
+    ) -> Iterator["SVGDocument"]:
+        """
+        Group the paths added inside a with block.
+
+        Parameters
+        ----------
+        transform : NDArray | Transform | None
+            Affine matrix of shape (3x3), or the matrix of the pending
+            transformations of a `Transform`, applied by the viewer to
+            the group. Unlike the transformations of the paths it
+            also scales the strokes.
+        **attributes : Any
+            Presentation attributes inherited by the paths of the group.
+        """
+        if isinstance(transform, Transform):
+            transform = transform.matrix
+        if transform is not None:
+            m = np.asarray(transform, dtype=np.float64)
+            values = " ".join(
+                str(v) for v in m[[0, 1, 0, 1, 0, 1], [0, 0, 1, 1, 2, 2]]
+            )
+            attributes = {"transform": f"matrix({values})", **attributes}
+        indent = "  " * (self._depth + 1)
+        self._write(f"{indent}<g{SVGDocument._attributes(attributes)}>\n")
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+        self._write(f"{indent}</g>\n")
+
+    def add_path(
+        self,
+        a: "NDArray | Transform",
+        decimals: int | None = None,
+        bezier: bool = False,
+        **attributes: Any,
+    ) -> None:
+        """
+        Stream an array of points as a path.
+
+        Parameters
+        ----------
+        a : NDArray | Transform
+            Points of shape (3xn) in user units, or a `Transform`
+            whose pending transformations are applied chunk by chunk.
+        decimals : int | None
+            Compact encoding of the path, by default
+            the one of the document.
+        bezier : bool
+            The points are the control points of cubic Bezier
+            curves of shape (3x(3k+1)), see `Spirograph.bezier`.
+            Affine transformations map the control points of a
+            Bezier curve to the ones of the transformed curve.
+        **attributes : Any
+            Presentation attributes of the path.
+        """
+        transform = a if isinstance(a, Transform) else Transform(a, copy=False)
+        if bezier and transform.shape[1] % 3 != 1:
+            raise ValueError("Bezier paths must have 3k+1 control points.")
+        decimals = self.decimals if decimals is None else decimals
+        SVGDocument._check_decimals(decimals)
+        chunks = transform.chunks(self.chunk_size)
+        if bezier:
+            chunks = SVGEncoder._bezier_chunks(chunks)
+        format_chunk = (
+            SVGEncoder._format_bezier if bezier else SVGEncoder._format_points
+        )
+        self._write("  " * (self._depth + 1) + '<path d="')
+        # The pending transformations are applied while encoding
+        with profiling.stage("encode", transform.shape[1]):
+            if decimals is None:
+                for i, chunk in enumerate(chunks):
+                    self._write(format_chunk(chunk, i == 0))
+            else:
+                SVGEncoder._write_relative(
+                    self._out,  # type: ignore[arg-type]
+                    chunks,
+                    decimals,
+                    bezier,
+                )
+        self._write(
+            '    "\n        '
+            + SVGDocument._attributes(attributes)[1:]
+            + " />\n"
+        )
+
+    def add_grid(
+        self,
+        trajectories: Iterable[NDArray],
+        columns: int,
+        cell: float = 2.0,
+        extent: tuple[float, float, float, float] = (-1, 1, -1, 1),
+        **attributes: Any,
+    ) -> int:
+        """
+        Lay out trajectories row by row in square cells, e.g. for a
+        contact sheet. The trajectories may be produced one by one by
+        a generator, only one of them is ever needed at once.
+
+        Parameters
+        ----------
+        trajectories : Iterable[NDArray]
+            Trajectories of shape (3xn).
+        columns : int
+            Number of cells per row.
+        cell : float
+            Size of a cell in cm.
+        extent : tuple[float, float, float, float]
+            Region (xmin, xmax, ymin, ymax) of the
+            trajectories fitted in each cell.
+        **attributes : Any
+            Presentation attributes of the group of the grid, by
+            default black strokes of width 1 without fill.
+
+        Returns
+        -------
+        int : Number of trajectories written.
+        """
+        xmin, xmax, ymin, ymax = extent
+        size = 100 * cell
+        scale = size / max(xmax - xmin, ymax - ymin)
+        attributes = {
+            "fill": "none",
+            "stroke": "black",
+            "stroke_width": 1,
+            **attributes,
+        }
+        count = 0
+        with self.group(**attributes):
+            for count, a in enumerate(trajectories, start=1):
+                row, column = divmod(count - 1, columns)
+                self.add_path(
+                    Transform(a, copy=False)
+                    .translate(-(xmin + xmax) / 2, -(ymin + ymax) / 2)
+                    .scale(scale, scale)
+                    .translate((column + 0.5) * size, (row + 0.5) * size)
+                )
+        return count
+
+    @staticmethod
+    def grid_size(
+        count: int, columns: int, cell: float = 2.0
+    ) -> tuple[float, float]:
+        """Width and height in cm of a grid of count cells."""
+        return columns * cell, -(-count // columns) * cell
+
+    @staticmethod
+    def _check_decimals(decimals: int | None) -> None:
+        if decimals is not None and decimals < 0:
+            raise ValueError("Number of decimals must be positive or zero.")
+
+    @staticmethod
+    def _attributes(attributes: dict[str, Any]) -> str:
+        return "".join(
+            f' {key.replace("_", "-")}="{html.escape(str(value))}"'
+            for key, value in attributes.items()
+            if value is not None
+        )
+
+
 if __name__ == "__main__":
     import time
 
@@ -66,8 +501,6 @@ if __name__ == "__main__":
     e.add_circles(radius / np.sum(radius), speed, angle_i)
     e.time = np.linspace(0, 2 * np.pi, int(60 * np.max(speed)))
 
-    svg = SVGEncoder.encode_path(e.trajectory)
-    with open("test.svg", "w", encoding="utf-8") as f:
-        f.write(svg)
+    SVGEncoder.write_path(e.trajectory, "test.svg")
 
     print(f"Execution time: {(time.time()-t_0)*1000:.1f} ms.")
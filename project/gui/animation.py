@@ -0,0 +1,145 @@
+"""Module for the animation of the drawing arm."""
+
+import numpy as np
+import pyqtgraph as pg  # type: ignore
+from numpy.typing import NDArray
+from PySide6.QtCore import QElapsedTimer, QObject, Qt, QTimer, Signal, Slot
+from PySide6.QtWidgets import QGraphicsEllipseItem
+
+
+class DrawingAnimation(QObject):
+    """
+    Class animating the rolling circle and the pen arm
+    while the trajectory is drawn.
+
+    The drawn curve is split into chunks with a preallocated buffer
+    each, every frame only copies the newly revealed samples into the
+    active chunk, so the cost of a frame does not depend on the
+    length of the curve drawn so far.
+
+    Attributes
+    ----------
+    duration : float
+        Time in seconds to draw the whole trajectory.
+    """
+
+    progress = Signal(int)
+    finished = Signal()
+
+    CHUNK = 4096
+    FRAME = 16
+
+    def __init__(self, plot_widget: pg.PlotWidget) -> None:
+        super().__init__()
+        self.plot_widget = plot_widget
+        self.duration = 10.0
+        self.index = 0
+        self._spiro: NDArray = np.empty((3, 0))
+        self._centers: NDArray = np.empty((3, 0))
+        self._k_r = 0.0
+        self._start = 0
+        self._chunks: list[pg.PlotCurveItem] = []
+        self._buffer: NDArray = np.empty((2, self.CHUNK + 1))
+        self._fill = 0
+
+        pen = pg.mkPen("gray")
+        self.stationary = QGraphicsEllipseItem(-1, -1, 2, 2)
+        self.stationary.setPen(pen)
+        self.rolling = QGraphicsEllipseItem()
+        self.rolling.setPen(pen)
+        self.arm = pg.PlotCurveItem(pen=pg.mkPen("red"))
+        for item in (self.stationary, self.rolling, self.arm):
+            item.setVisible(False)
+            self.plot_widget.addItem(item)
+
+        self.timer = QTimer()
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.setInterval(self.FRAME)
+        self.timer.timeout.connect(self.step)
+        self.clock = QElapsedTimer()
+
+    @property
+    def playing(self) -> bool:
+        return self.timer.isActive()
+
+    def play(
+        self, spiro: NDArray, centers: NDArray, k_r: float, start: int = 0
+    ) -> None:
+        """
+        Start drawing a trajectory from a given sample.
+
+        Parameters
+        ----------
+        spiro : NDArray
+            Spirograph trajectory of shape (3xn).
+        centers : NDArray
+            Trajectory of the center of the rolling circle of shape (3xn).
+        k_r : float
+            Radius of the rolling circle.
+        start : int
+            Index of the first sample drawn, the samples before
+            it are expected to be already shown.
+        """
+        self.clear()
+        self._spiro = spiro
+        self._centers = centers
+        self._k_r = k_r
+        self._start = self.index = max(0, min(start, spiro.shape[1] - 1))
+        self._new_chunk()
+        for item in (self.stationary, self.rolling, self.arm):
+            item.setVisible(True)
+        self.clock.start()
+        self.timer.start()
+
+    def stop(self) -> None:
+        self.timer.stop()
+
+    def clear(self) -> None:
+        """Stop the animation and remove the drawn chunks."""
+        self.timer.stop()
+        for chunk in self._chunks:
+            self.plot_widget.removeItem(chunk)
+        self._chunks = []
+        for item in (self.stationary, self.rolling, self.arm):
+            item.setVisible(False)
+
+    @Slot()
+    def step(self) -> None:
+        """Slot to draw the samples revealed since the last frame."""
+        n = self._spiro.shape[1]
+        elapsed = self.clock.elapsed() / 1000
+        target = min(n, self._start + 1 + int(elapsed * n / self.duration))
+        while self.index + 1 < target:
+            if self._fill > self.CHUNK:
+                # The full chunk is left as is and a new one is started
+                self._chunks[-1].setData(self._buffer[0], self._buffer[1])
+                self._new_chunk()
+            take = min(self.CHUNK + 1 - self._fill, target - self.index - 1)
+            self._buffer[:, self._fill : self._fill + take] = self._spiro[
+                :2, self.index + 1 : self.index + 1 + take
+            ]
+            self._fill += take
+            self.index += take
+        self._chunks[-1].setData(
+            self._buffer[0, : self._fill], self._buffer[1, : self._fill]
+        )
+
+        cx, cy = self._centers[:2, self.index]
+        px, py = self._spiro[:2, self.index]
+        k_r = self._k_r
+        self.rolling.setRect(cx - k_r, cy - k_r, 2 * k_r, 2 * k_r)
+        self.arm.setData([cx, px], [cy, py])
+
+        self.progress.emit(self.index + 1)
+        if self.index + 1 >= n:
+            self.timer.stop()
+            self.finished.emit()
+
+    def _new_chunk(self) -> None:
+        """Start a new chunk continuing from the current sample."""
+        self._buffer = np.empty((2, self.CHUNK + 1))
+        self._buffer[:, 0] = self._spiro[:2, self.index]
+        self._fill = 1
+        chunk = pg.PlotCurveItem(pen="black")
+        self.plot_widget.addItem(chunk)
+        self._chunks.append(chunk)
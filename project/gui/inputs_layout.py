@@ -1,8 +1,9 @@
 """Module for the layout of inputs."""
 
 import os
+from typing import Any
 
-from PySide6.QtCore import Qt, Slot
+from PySide6.QtCore import Qt, QThreadPool, QTimer, Slot
 from PySide6.QtWidgets import (
     QFileDialog,
     QHBoxLayout,
@@ -13,19 +14,45 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
+from project.core import profiling
+from project.core.cache import TrajectoryCache
 from project.core.geometry import Spirograph
+from project.core.lod import LODPyramid
 from project.core.svg_encoder import SVGEncoder
 from project.gui.preview_layout import PreviewLayout
+from project.gui.worker import TrajectorySignals, TrajectoryTask
 
 
 class InputsLayout(QVBoxLayout):
     """Class for the layout of inputs."""
 
+    # Widgets of the inputs read by name, set by add_input
+    l_input_value: QLineEdit
+    k_input_value: QLineEdit
+    t_input_value: QLineEdit
+    t_input_slider: QSlider
+    t_input_s_scale: float
+    steps_input_value: QLineEdit
+
     def __init__(self, preview: PreviewLayout) -> None:
         super().__init__()
         # Initialize inputs layout
         self.internal_layout = QVBoxLayout()
         self.preview = preview
+        self.cache = TrajectoryCache()
+
+        # Trajectories are computed in a background thread, only the
+        # result of the latest generation of parameters is drawn
+        self._generation = 0
+        self._parameters: tuple[float, float, float, float, int] | None = None
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(1)
+        self.signals = TrajectorySignals()
+        self.signals.finished.connect(self.set_trajectory)
+        self.debounce = QTimer()
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(30)
+        self.debounce.timeout.connect(self.submit_trajectory)
 
         # Define button slot
         @Slot()
@@ -48,6 +75,20 @@ class InputsLayout(QVBoxLayout):
         self.save_layout.addWidget(self.save_buttton)
         self.save_layout.addStretch()
 
+        # Drawing animation, built on the "t" slider
+        self.play_layout = QHBoxLayout()
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_animation)
+        self.play_layout.addStretch()
+        self.play_layout.addWidget(self.play_button)
+        self.play_layout.addStretch()
+        self.preview.animation.progress.connect(self.set_t_progress)
+        self.preview.animation.finished.connect(self.finish_animation)
+
+        # Timings of the last update, only shown when profiling
+        self.status = QLabel()
+        self.status.setVisible(profiling.enabled())
+
         # Initialize sliders
         self._active = False
         self.add_input("l", 0.8, s_scale=0.01)
@@ -57,12 +98,22 @@ class InputsLayout(QVBoxLayout):
         self._active = True
 
         # Update preview
-        self.update_spirograph()
+        parameters = self.parameters()
+        t, spiro = self.cache.get(*parameters)
+        self.set_trajectory(
+            self._generation,
+            parameters,
+            t,
+            spiro,
+            self.cache.pyramid(*parameters),
+        )
 
         # Populate layout
         self.addLayout(self.internal_layout)
         self.addStretch()
+        self.addLayout(self.play_layout)
         self.addLayout(self.save_layout)
+        self.addWidget(self.status)
         # self.addLayout(self.add_input_layout)
 
     @Slot()
@@ -71,9 +122,9 @@ class InputsLayout(QVBoxLayout):
             dir=str(os.path.join(os.getcwd(), "out")),
             filter="*.svg",
         )[0]
-        with open(save_file, "w", encoding="utf-8") as f:
-            svg = SVGEncoder.encode_path(self.spiro)
-            f.write(svg)
+        # The preview may still be waiting for the latest parameters
+        _, spiro = self.cache.get(*self.parameters())
+        SVGEncoder.write_path(spiro, save_file)
 
     def add_input(
         self,
@@ -135,20 +186,119 @@ class InputsLayout(QVBoxLayout):
         setattr(self, name + "_input_slider", input_slider)
         setattr(self, name + "_input_s_scale", s_scale)
 
-    def update_spirograph(self) -> None:
-        self.t = Spirograph.angles(
+    def parameters(self) -> tuple[float, float, float, float, int]:
+        """Return the trajectory parameters currently set in the inputs."""
+        return (
+            float(self.l_input_value.text()),
+            float(self.k_input_value.text()),
             0,
             self.t_input_slider.maximum() * self.t_input_s_scale,
             int(float(self.steps_input_value.text())),
         )
-        self.spiro = Spirograph.trajectory(
-            float(self.l_input_value.text()),
-            float(self.k_input_value.text()),
-            self.t,
+
+    def update_spirograph(self) -> None:
+        if self.parameters() == self._parameters:
+            # Moving the "t" slider only changes the slice of the curve
+            self.draw_spirograph()
+        else:
+            # Rapid changes are coalesced into a single computation
+            self.debounce.start()
+
+    @Slot()
+    def submit_trajectory(self) -> None:
+        """Slot to compute the trajectory of the current parameters."""
+        self._generation += 1
+        # The status only shows the stages of this render, a cached
+        # trajectory has no trajectory stage
+        profiling.reset()
+        # Tasks still waiting in the queue are stale
+        self.thread_pool.clear()
+        self.thread_pool.start(
+            TrajectoryTask(
+                self._generation,
+                self.parameters(),
+                self.cache,
+                self.signals,
+                lambda: self._generation,
+            )
         )
+
+    @Slot(int, object, object, object, object)
+    def set_trajectory(
+        self,
+        generation: int,
+        parameters: Any,
+        t: Any,
+        spiro: Any,
+        pyramid: LODPyramid,
+    ) -> None:
+        """Slot to receive a computed trajectory."""
+        if generation != self._generation:
+            return
+        self._parameters = parameters
+        self.t = t
+        self.spiro = spiro
+        self.preview.set_pyramid(pyramid)
+        self.draw_spirograph()
+
+    def draw_spirograph(self) -> None:
         t_s = int(
             self.t_input_slider.value()
             / self.t_input_slider.maximum()
             * self.spiro.shape[1]
         )
-        self.preview.graph.setData(self.spiro[0, :t_s], self.spiro[1, :t_s])
+        self.preview.draw(t_s)
+        self.play_button.setText("Play")
+        self.update_status()
+
+    def update_status(self) -> None:
+        """Show the duration of the last call of each stage."""
+        if profiling.enabled():
+            self.status.setText(
+                " | ".join(
+                    f"{name} {values['last'] * 1000:.1f} ms"
+                    for name, values in profiling.stats().items()
+                )
+            )
+
+    @Slot()
+    def toggle_animation(self) -> None:
+        """Slot to play or pause the drawing animation."""
+        animation = self.preview.animation
+        if animation.playing:
+            animation.stop()
+            self.play_button.setText("Play")
+            # The drawn part becomes the static preview again
+            self.preview.draw(animation.index + 1)
+            return
+
+        start = self.preview.stop
+        if start >= self.spiro.shape[1]:
+            start = 0
+        self.preview.draw(start)
+        k_r = float(self.k_input_value.text())
+        animation.play(
+            self.spiro, Spirograph.rolling_circle(k_r, self.t), k_r, start
+        )
+        self.play_button.setText("Pause")
+
+    @Slot()
+    def finish_animation(self) -> None:
+        """Slot to show the whole trajectory once it is drawn."""
+        self.play_button.setText("Play")
+        # The next play rewinds to the first sample
+        self.preview.draw(self.spiro.shape[1])
+
+    @Slot(int)
+    def set_t_progress(self, stop: int) -> None:
+        """Slot to follow the animation with the "t" slider."""
+        value = round(
+            stop / self.spiro.shape[1] * self.t_input_slider.maximum()
+        )
+        # The signals would redraw the static preview
+        self.t_input_slider.blockSignals(True)
+        self.t_input_value.blockSignals(True)
+        self.t_input_slider.setValue(value)
+        self.t_input_value.setText(f"{(value * self.t_input_s_scale):0.2f}")
+        self.t_input_slider.blockSignals(False)
+        self.t_input_value.blockSignals(False)
@@ -1,8 +1,13 @@
 """Module for the layout of the drawing preview."""
 
 import pyqtgraph as pg  # type: ignore
+from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QVBoxLayout
 
+from project.core import profiling
+from project.core.lod import LODPyramid
+from project.gui.animation import DrawingAnimation
+
 
 class PreviewLayout(QVBoxLayout):
     """Class for the layout of the drawing preview."""
@@ -18,3 +23,30 @@ class PreviewLayout(QVBoxLayout):
 
         self.plot_widget.setMaximumWidth(500)
         self.addWidget(self.plot_widget)
+
+        # The preview draws a decimated trajectory matching the zoom,
+        # the full resolution is only used for the SVG export
+        self.pyramid: LODPyramid | None = None
+        self.stop = 0
+        self.plot_widget.getViewBox().sigRangeChanged.connect(self.redraw)
+
+        self.animation = DrawingAnimation(self.plot_widget)
+
+    def set_pyramid(self, pyramid: LODPyramid) -> None:
+        self.pyramid = pyramid
+
+    def draw(self, stop: int) -> None:
+        """Draw the first stop samples of the trajectory."""
+        self.animation.clear()
+        self.stop = stop
+        self.redraw()
+
+    @Slot()
+    def redraw(self) -> None:
+        """Slot to draw the level of detail matching the current view."""
+        if self.pyramid is None:
+            return
+        pixel_size = min(self.plot_widget.getViewBox().viewPixelSize())
+        points = self.pyramid.points(self.stop, pixel_size)
+        with profiling.stage("plot", points.shape[1]):
+            self.graph.setData(points[0], points[1])
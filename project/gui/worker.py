@@ -0,0 +1,43 @@
+"""Module for the computation of trajectories off the UI thread."""
+
+from typing import Callable
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from project.core.cache import TrajectoryCache
+
+
+class TrajectorySignals(QObject):
+    """Signals emitted by the trajectory tasks."""
+
+    # Generation, parameters, angles, trajectory and its LOD pyramid
+    finished = Signal(int, object, object, object, object)
+
+
+class TrajectoryTask(QRunnable):
+    """Task computing a spirograph trajectory in a thread pool."""
+
+    def __init__(
+        self,
+        generation: int,
+        parameters: tuple[float, float, float, float, int],
+        cache: TrajectoryCache,
+        signals: TrajectorySignals,
+        current: Callable[[], int],
+    ) -> None:
+        super().__init__()
+        self.generation = generation
+        self.parameters = parameters
+        self.cache = cache
+        self.signals = signals
+        self.current = current
+
+    def run(self) -> None:
+        # A newer parameter set was requested while this task waited
+        if self.generation != self.current():
+            return
+        t, spiro = self.cache.get(*self.parameters)
+        pyramid = self.cache.pyramid(*self.parameters)
+        self.signals.finished.emit(
+            self.generation, self.parameters, t, spiro, pyramid
+        )
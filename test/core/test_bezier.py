@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+
+from project.core.bezier import bezier_spans
+
+
+def bezier_points(b: NDArray, steps: int = 33) -> NDArray:
+    """Evaluate Bezier spans of shape (3x(3k+1)) at steps values of u."""
+    u = np.linspace(0, 1, steps)[:, None]
+    p0, p1, p2, p3 = b[:2, :-1:3], b[:2, 1::3], b[:2, 2::3], b[:2, 3::3]
+    return (
+        (1 - u) ** 3 * p0[:, None]
+        + 3 * (1 - u) ** 2 * u * p1[:, None]
+        + 3 * (1 - u) * u**2 * p2[:, None]
+        + u**3 * p3[:, None]
+    ).reshape(2, -1)
+
+
+@pytest.mark.parametrize("tf", [4 * np.pi, -3.0])
+def test_bezier_spans(tf: float) -> None:
+    tol = 1e-5
+    b = bezier_spans(
+        lambda t: np.stack([np.cos(t), np.sin(t)]),
+        lambda t: np.stack([-np.sin(t), np.cos(t)]),
+        np.linspace(0, tf, 3),
+        tol,
+    )
+    assert b.shape[1] % 3 == 1
+    np.testing.assert_allclose(b[:, 0], [1, 0, 1])
+    np.testing.assert_allclose(b[:, -1], [np.cos(tf), np.sin(tf), 1])
+    # Distance to the unit circle
+    assert np.abs(np.hypot(*bezier_points(b)) - 1).max() < tol
+    # Far fewer spans than the chords of the same tolerance
+    assert (b.shape[1] - 1) // 3 < abs(tf) / np.sqrt(8 * tol) / 10
@@ -0,0 +1,65 @@
+import io
+from pathlib import Path
+
+import numpy as np
+
+from project.core.cache import TrajectoryCache, TrajectoryStore
+from project.core.epicycle import Epicycle
+from project.core.geometry import Spirograph
+from project.core.svg_encoder import SVGEncoder
+
+
+def test_trajectory_cache() -> None:
+    cache = TrajectoryCache(maxsize=2)
+    t, spiro = cache.get(0.8, 0.67, 0, 8 * np.pi, 100)
+    np.testing.assert_array_equal(
+        spiro,
+        Spirograph.trajectory(0.8, 0.67, Spirograph.angles(0, 8 * np.pi, 100)),
+    )
+    assert not spiro.flags.writeable
+    assert cache.get(0.8, 0.67, 0, 8 * np.pi, 100)[1] is spiro
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get(0.5, 0.67, 0, 8 * np.pi, 100)
+    cache.get(0.8, 0.67, 0, 8 * np.pi, 100)
+    cache.get(0.5, 0.3, 0, 8 * np.pi, 100)
+    assert len(cache) == 2
+    # The least recently used entry was evicted
+    assert cache.get(0.8, 0.67, 0, 8 * np.pi, 100)[1] is spiro
+    cache.get(0.5, 0.67, 0, 8 * np.pi, 100)
+    assert cache.misses == 4
+
+    # The pyramids are built once and evicted with their trajectory
+    pyramid = cache.pyramid(0.5, 0.67, 0, 8 * np.pi, 100)
+    assert pyramid.a is cache.get(0.5, 0.67, 0, 8 * np.pi, 100)[1]
+    assert cache.pyramid(0.5, 0.67, 0, 8 * np.pi, 100) is pyramid
+    cache.get(0.1, 0.67, 0, 8 * np.pi, 100)
+    cache.get(0.2, 0.67, 0, 8 * np.pi, 100)
+    assert cache.pyramid(0.5, 0.67, 0, 8 * np.pi, 100) is not pyramid
+
+
+def test_trajectory_store(tmp_path: Path) -> None:
+    store = TrajectoryStore(str(tmp_path))
+    e = Epicycle(lean=True)
+    e.add_circles([1, 0.5, 0.2], [1, -3, 7], [0, 0.1, 0.2])
+    a = store.get(e, 0, 2 * np.pi, 1001, chunk_size=100)
+    assert isinstance(a, np.memmap) and not a.flags.writeable
+
+    e.time = np.linspace(0, 2 * np.pi, 1001)
+    np.testing.assert_array_equal(a, e.trajectory)
+    assert store.get(e, 0, 2 * np.pi, 1001).filename == a.filename
+    assert (store.hits, store.misses) == (1, 1)
+
+    # Stored trajectories are streamed to the encoder as they are
+    f = io.StringIO()
+    SVGEncoder.write_path(a, f, chunk_size=64)
+    assert f.getvalue() == SVGEncoder.encode_path(e.trajectory, 10, 0.5)
+
+    e.method = "direct"
+    assert store.get(e, 0, 2 * np.pi, 1001).filename != a.filename
+    e.add_circle(0.1, 11, 0)
+    store.get(e, 0, 2 * np.pi, 1001)
+    assert store.misses == 3
+    assert len(list(tmp_path.glob("*.npy"))) == 3
+    store.clear()
+    assert not list(tmp_path.glob("*"))
@@ -0,0 +1,319 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from project.core.cache import TrajectoryStore
+from project.core.epicycle import Epicycle, fft_circles, sum_circles
+
+radius = [0.5, 0.3, 0.2]
+speed = [3, -7, 31]
+angle_i = [0.0, 1.0, 2.5]
+
+
+def reference(t: np.ndarray) -> np.ndarray:
+    x = np.zeros_like(t)
+    y = np.zeros_like(t)
+    for r, s, a in zip(radius, speed, angle_i):
+        x += r * np.cos(t * s + a)
+        y += r * np.sin(t * s + a)
+    return np.stack([x, y, np.ones_like(t)])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 2**20])
+def test_trajectory(chunk_size: int) -> None:
+    t = np.linspace(0, 2 * np.pi, 1001)
+    e = Epicycle(chunk_size=chunk_size)
+    e.add_circles(radius, speed, angle_i)
+    e.time = t
+    np.testing.assert_allclose(e.trajectory, reference(t), atol=1e-12)
+
+
+def test_sum_circles_out() -> None:
+    t = np.linspace(0, 1, 50)
+    out = np.empty((2, 50))
+    res = sum_circles(
+        np.array(radius), np.array(speed), np.array(angle_i), t, out=out
+    )
+    assert res is out
+    np.testing.assert_allclose(out, reference(t)[:2], atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "t",
+    [
+        np.linspace(0, 2 * np.pi, 1001),
+        np.linspace(1, 1 + 4 * np.pi, 599),
+        np.linspace(0, -2 * np.pi, 64, endpoint=False),
+    ],
+)
+def test_fft(t: np.ndarray) -> None:
+    e = Epicycle(method="fft")
+    e.add_circles(radius, speed, angle_i)
+    e.time = t
+    np.testing.assert_allclose(e.trajectory, reference(t), atol=1e-12)
+
+    # Not an integer number of samples per period
+    assert fft_circles(np.ones(1), np.ones(1), np.zeros(1), t * 1.01) is None
+    with pytest.raises(ValueError):
+        e.time = t * 1.01
+
+
+def test_fft_almost_periodic() -> None:
+    # The period is missed by about 1e-9, which drifts by far more
+    # than the rounding errors over fast circles
+    t = np.linspace(0, 6.283185307, 10001)
+    rng = np.random.default_rng(0)
+    circles = rng.random(50), rng.integers(-500, 501, 50), rng.random(50)
+    assert fft_circles(*circles, t) is None
+    e = Epicycle()
+    e.add_circles(*map(list, circles))
+    e.time = t
+    direct = Epicycle(method="direct")
+    direct.add_circles(*map(list, circles))
+    direct.time = t
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-12)
+
+
+@pytest.mark.parametrize("steps", [1000, 1001])
+def test_fft_chunks(steps: int, tmp_path: Path) -> None:
+    t = np.linspace(0, 2 * np.pi, steps)
+    e = Epicycle(lean=True, method="fft")
+    e.add_circles(radius, speed, angle_i)
+    # With 1001 steps the last chunk has a single sample
+    chunks = np.hstack(list(e.chunks(0, 2 * np.pi, steps, chunk_size=100)))
+    np.testing.assert_allclose(chunks, reference(t), atol=1e-12)
+    store = TrajectoryStore(str(tmp_path))
+    a = store.get(e, 0, 2 * np.pi, steps, chunk_size=100)
+    np.testing.assert_array_equal(a, chunks)
+
+    e.time = t
+    np.testing.assert_array_equal(e.trajectory, chunks)
+    e.time = t[: steps - 1]
+    e.extend(t[steps - 1 :])
+    np.testing.assert_allclose(e.trajectory, reference(t), atol=1e-12)
+
+
+def test_recurrence(tmp_path: Path) -> None:
+    t = np.linspace(0.1, 10, 1001)
+    e = Epicycle(method="recurrence", chunk_size=100)
+    e.add_circles(radius, [3.5, -7.1, 31], angle_i)
+    e.time = t
+    direct = Epicycle(method="direct")
+    direct.add_circles(radius, [3.5, -7.1, 31], angle_i)
+    direct.time = t
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-12)
+    with pytest.raises(ValueError):
+        e.time = t**2
+
+    # Chunks and extensions of a single sample are summed directly
+    store = TrajectoryStore(str(tmp_path))
+    a = store.get(e, 0.1, 10, 1001, chunk_size=100)
+    np.testing.assert_allclose(a, direct.trajectory, atol=1e-12)
+    e.time = t[:1000]
+    e.extend(t[1000:])
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-12)
+
+
+def test_symmetry(tmp_path: Path) -> None:
+    e = Epicycle(method="symmetry")
+    e.add_circles([1, 0.5, 0.2], [1, -5, 7], [0, 0.1, 0.2])
+    assert e.symmetry() == pytest.approx((np.pi / 3, np.pi / 3))
+    t = np.linspace(0.3, 0.3 + 2 * np.pi, 6 * 100 + 1)
+    e.time = t
+    direct = Epicycle(method="direct")
+    direct.add_circles([1, 0.5, 0.2], [1, -5, 7], [0, 0.1, 0.2])
+    direct.time = t
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-13)
+    with pytest.raises(ValueError):
+        e.time = np.linspace(0, 2 * np.pi, 1000)
+
+    # A single circle is a single lobe
+    single = Epicycle(method="symmetry")
+    single.add_circle(0.5, 3, 0.2)
+    assert single.symmetry() == (2 * np.pi, 0.0)
+    single.time = t
+    np.testing.assert_allclose(
+        single.trajectory,
+        [
+            0.5 * np.cos(3 * t + 0.2),
+            0.5 * np.sin(3 * t + 0.2),
+            np.ones_like(t),
+        ],
+        atol=1e-13,
+    )
+
+    # Chunks and extensions shorter than a lobe are summed directly
+    store = TrajectoryStore(str(tmp_path))
+    a = store.get(e, 0.3, 0.3 + 2 * np.pi, 1001, chunk_size=100)
+    chunks = direct.chunks(0.3, 0.3 + 2 * np.pi, 1001, chunk_size=100)
+    np.testing.assert_allclose(a, np.hstack(list(chunks)), atol=1e-13)
+    e.time = t[:-1]
+    e.extend(t[-1:])
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-13)
+    extension = t[-1] + np.array([0.01, 0.02, 0.03])
+    e.extend(extension)
+    direct.extend(extension)
+    np.testing.assert_allclose(e.trajectory, direct.trajectory, atol=1e-13)
+
+
+def test_workers() -> None:
+    t = np.linspace(0.1, 10, 100003)
+    trajectories = []
+    for workers in (1, 3, None):
+        e = Epicycle(method="direct", workers=workers)
+        e.add_circles(radius, speed, angle_i)
+        e.time = t
+        trajectories.append(e.trajectory)
+    np.testing.assert_array_equal(trajectories[0], trajectories[1])
+    np.testing.assert_array_equal(trajectories[0], trajectories[2])
+    with pytest.raises(ValueError):
+        Epicycle(method="direct", workers=0).time = t
+    # The samples of the FFT period are read on the threads as well
+    t = np.linspace(0.1, 0.1 + 2 * np.pi, 100003)
+    trajectories = []
+    for workers in (1, 3):
+        e = Epicycle(method="fft", workers=workers)
+        e.add_circles([1, 0.5, 0.2], [1, -5, 7], [0, 0.1, 0.2])
+        e.time = t
+        trajectories.append(e.trajectory)
+    np.testing.assert_array_equal(trajectories[0], trajectories[1])
+    for method in ("recurrence", "symmetry"):
+        with pytest.raises(ValueError):
+            Epicycle(method=method, workers=2)
+        # Also when the attribute is changed afterwards
+        e = Epicycle(method=method)
+        e.add_circles([1, 0.5, 0.2], [1, -5, 7], [0, 0.1, 0.2])
+        e.workers = 2
+        with pytest.raises(ValueError):
+            e.time = t
+
+
+def test_circle_local_arrays() -> None:
+    t = np.linspace(0, 1, 10)
+    e = Epicycle()
+    e.add_circles(radius, speed, angle_i)
+    e.time = t
+    circle = e._circles[1]
+    np.testing.assert_allclose(
+        circle.local_x, radius[1] * np.cos(t * speed[1] + angle_i[1])
+    )
+
+
+def test_derivative() -> None:
+    e = Epicycle()
+    e.add_circles(radius, speed, angle_i)
+    t = np.linspace(0, 1, 20)
+    h = 1e-6
+    np.testing.assert_allclose(
+        e.derivative(t),
+        (reference(t + h) - reference(t - h)) / (2 * h),
+        atol=1e-6,
+    )
+
+
+def test_adaptive_time() -> None:
+    tol = 1e-3
+    e = Epicycle()
+    e.add_circles(radius, speed, angle_i)
+    e.time = e.adaptive_time(0, 2 * np.pi, tol)
+    t = e.time
+    mid = reference((t[1:] + t[:-1]) / 2)
+    chord = (e.trajectory[:, 1:] + e.trajectory[:, :-1]) / 2
+    assert np.hypot(*(mid - chord)[:2]).max() < 1.1 * tol
+
+
+def test_bezier() -> None:
+    tol = 1e-4
+    e = Epicycle(lean=True)
+    e.add_circles(radius, speed, angle_i)
+    b = e.bezier(0, 2 * np.pi, tol)
+    assert b.shape[1] % 3 == 1
+    np.testing.assert_allclose(
+        b[:, [0, -1]], reference(np.array([0, 2 * np.pi])), atol=1e-12
+    )
+    # Control points are points in homogeneous coordinates
+    np.testing.assert_array_equal(b[2], 1)
+    assert (b.shape[1] - 1) // 3 < e.adaptive_time(0, 2 * np.pi, tol).shape[0]
+
+
+def test_extend() -> None:
+    t = np.linspace(0, 4 * np.pi, 1000)
+    e = Epicycle()
+    e.add_circles(radius, speed, angle_i)
+    e.time = t[:100]
+    for start in range(100, 1000, 150):
+        e.extend(t[start : start + 150])
+    np.testing.assert_array_equal(e.time, t)
+    np.testing.assert_allclose(e.trajectory, reference(t), atol=1e-12)
+    assert e._buffer.shape[1] < 2 * len(t)
+
+
+def test_time_prefix() -> None:
+    t = np.linspace(0, 4 * np.pi, 1000)
+    e = Epicycle()
+    e.add_circles(radius, speed, angle_i)
+    e.time = t[:500]
+    e._buffer[0, 0] = 10.0
+    e.time = t
+    # The first samples were not recomputed
+    assert e.trajectory[0, 0] == 10.0
+    e.time = t[:10]
+    np.testing.assert_allclose(e.trajectory, reference(t[:10]), atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "ti, tf, steps", [(0, 2 * np.pi, 1001), (0.3, -5, 7), (0, 1, 1)]
+)
+def test_chunks(ti: float, tf: float, steps: int) -> None:
+    e = Epicycle(lean=True, method="direct")
+    e.add_circles(radius, speed, angle_i)
+    chunks = list(e.chunks(ti, tf, steps, chunk_size=3))
+    assert max(chunk.shape[1] for chunk in chunks) <= 3
+    # The samples are the ones of np.linspace
+    e.time = np.linspace(ti, tf, steps)
+    np.testing.assert_array_equal(np.hstack(chunks), e.trajectory)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_lean(dtype: type) -> None:
+    t = np.linspace(0, 2 * np.pi, 1001)
+    e = Epicycle(lean=True, dtype=dtype)
+    e.add_circles(radius, speed, angle_i)
+    e.time = t
+    assert e.trajectory.dtype == dtype
+    assert not hasattr(e._circles[0], "__dict__")
+    np.testing.assert_allclose(
+        e.trajectory, reference(t), atol=1e-6 if dtype == np.float32 else 1e-12
+    )
+    np.testing.assert_allclose(
+        e.local_trajectory(2)[1], radius[2] * np.sin(t * speed[2] + angle_i[2])
+    )
+
+
+def test_fit() -> None:
+    t = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    e, error = Epicycle.fit(np.stack([2 * np.cos(t), 2 * np.sin(t)]), k=1)
+    circle = e._circles[0]
+    assert (circle.speed, error) == (1, pytest.approx(0, abs=1e-12))
+    assert circle.radius == pytest.approx(2, rel=1e-3)
+
+    square = np.array([[1, -1, -1, 1], [1, 1, -1, -1]])
+    t = np.linspace(0, 2 * np.pi, 400, endpoint=False)
+    full, error = Epicycle.fit(square, samples=400)
+    assert error == 0
+    full.time = t
+    errors = []
+    for k in (4, 16, 64):
+        e, error = Epicycle.fit(square, k=k, samples=400, lean=True)
+        e.time = t
+        rms = np.sqrt(
+            np.mean(np.sum((e.trajectory - full.trajectory) ** 2, 0))
+        )
+        assert len(e._circles) == k and rms == pytest.approx(error)
+        errors.append(error)
+    assert errors == sorted(errors, reverse=True)
+
+    e, error = Epicycle.fit(square, tol=0.01, samples=400)
+    fewer = Epicycle.fit(square, k=len(e._circles) - 1, samples=400)[1]
+    assert error <= 0.01 < fewer
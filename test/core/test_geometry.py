@@ -2,7 +2,9 @@ import numpy as np
 import pytest
 from numpy.typing import NDArray
 
-from project.core.geometry import Transform
+from project.core.geometry import Spirograph, Transform, n_polygon
+
+from .test_bezier import bezier_points
 
 a = np.array([[1], [1], [1]])
 
@@ -33,3 +35,168 @@ def test_rotate_p(a: NDArray, r: float, px: float, py: float) -> None:
             @ a
         ),
     )
+
+
+def test_trajectories() -> None:
+    l_r = np.array([0.8, 0.5, 1.0])
+    k_r = np.array([0.67, 0.3, 0.25])
+    t = Spirograph.angles(0, 2 * np.pi, 100)
+    batch = Spirograph.trajectories(l_r, k_r, t)
+    assert batch.shape == (3, 3, 100)
+    for i in range(3):
+        np.testing.assert_allclose(
+            batch[i], Spirograph.trajectory(l_r[i], k_r[i], t), atol=1e-12
+        )
+
+    t_rows = np.stack([t, 2 * t, 3 * t])
+    batch = Spirograph.trajectories(l_r, k_r, t_rows)
+    for i in range(3):
+        np.testing.assert_allclose(
+            batch[i],
+            Spirograph.trajectory(l_r[i], k_r[i], t_rows[i]),
+            atol=1e-12,
+        )
+
+
+def test_trajectories_ragged() -> None:
+    l_r = np.array([0.8, 0.5])
+    k_r = np.array([0.67, 0.3])
+    t = [Spirograph.angles(0, 1, 10), Spirograph.angles(0, 3, 25)]
+    buffer, offsets = Spirograph.trajectories_ragged(l_r, k_r, t)
+    np.testing.assert_array_equal(offsets, [0, 10, 35])
+    for i in range(2):
+        np.testing.assert_allclose(
+            buffer[:, offsets[i] : offsets[i + 1]],
+            Spirograph.trajectory(l_r[i], k_r[i], t[i]),
+        )
+
+
+@pytest.mark.parametrize("l_r, k_r", [(1.0, 0.67), (0.8, 0.3), (1.0, 0.1)])
+def test_adaptive_angles(l_r: float, k_r: float) -> None:
+    tol = 1e-3
+    t = Spirograph.adaptive_angles(l_r, k_r, 0, 20 * np.pi, tol)
+    a = Spirograph.trajectory(l_r, k_r, t)
+    mid = Spirograph.trajectory(l_r, k_r, (t[1:] + t[:-1]) / 2)
+    chord = (a[:, 1:] + a[:, :-1]) / 2
+    assert t[0] == 0 and np.isclose(t[-1], 20 * np.pi)
+    assert np.hypot(*(mid - chord)[:2]).max() < 1.1 * tol
+
+
+def test_bezier() -> None:
+    tol = 1e-5
+    b = Spirograph.bezier(0.0, 0.3, 0, 20 * np.pi, tol)
+    # Without arm the pen follows the center of the rolling circle
+    assert np.abs(np.hypot(*bezier_points(b)) - 0.7).max() < tol
+    b = Spirograph.bezier(0.8, 0.3, 0, 20 * np.pi, tol)
+    ends = Spirograph.trajectory(0.8, 0.3, np.array([0, 20 * np.pi]))
+    np.testing.assert_allclose(b[:, [0, -1]], ends, atol=1e-12)
+    t = Spirograph.adaptive_angles(0.8, 0.3, 0, 20 * np.pi, tol)
+    assert 10 * (b.shape[1] - 1) // 3 < t.shape[0]
+
+
+@pytest.mark.parametrize("n", [1, 3, 99, 10000])
+def test_recurrence(n: int) -> None:
+    t = Spirograph.angles(0.5, 20 * np.pi, n)
+    if n < 2:
+        with pytest.raises(ValueError):
+            Spirograph.trajectory(0.8, 0.3, t, method="recurrence")
+        return
+    np.testing.assert_allclose(
+        Spirograph.trajectory(0.8, 0.3, t, method="recurrence"),
+        Spirograph.trajectory(0.8, 0.3, t),
+        rtol=0,
+        atol=1e-13,
+    )
+    with pytest.raises(ValueError):
+        Spirograph.trajectory(0.8, 0.3, t**2, method="recurrence")
+
+
+@pytest.mark.parametrize("k_r, lobes", [(0.3, 10), (2 / 7, 7), (0.67, 100)])
+def test_symmetry(k_r: float, lobes: int) -> None:
+    period, angle = Spirograph.symmetry(k_r)
+    assert period == angle == pytest.approx(2 * np.pi * k_r)
+    t = np.linspace(0, lobes * period, lobes * 50 + 1)
+    np.testing.assert_allclose(
+        Spirograph.trajectory(0.8, k_r, t, method="symmetry"),
+        Spirograph.trajectory(0.8, k_r, t),
+        rtol=0,
+        atol=1e-12,
+    )
+    with pytest.raises(ValueError):
+        Spirograph.trajectory(0.8, np.sqrt(0.1), t, method="symmetry")
+
+
+def test_workers() -> None:
+    t = Spirograph.angles(0, 20 * np.pi, 100003)
+    serial = Spirograph.trajectory(0.8, 0.3, t)
+    np.testing.assert_array_equal(
+        Spirograph.trajectory(0.8, 0.3, t, workers=4), serial
+    )
+    l_r = np.full_like(t, 0.8)
+    np.testing.assert_array_equal(
+        Spirograph.trajectory(l_r, 0.3, t, workers=None), serial
+    )
+    with pytest.raises(ValueError):
+        Spirograph.trajectory(0.8, 0.3, t, "recurrence", workers=2)
+
+
+def test_transform_chain() -> None:
+    b = n_polygon(5)
+    expected = Transform._scale_p(
+        Transform._rotate_p(Transform._translate(b, 1, 2), 0.3, 1, 1),
+        2,
+        3,
+        0.5,
+        0.5,
+    )
+    transform = (
+        Transform(b)
+        .translate(1, 2)
+        .rotate_p(0.3, 1, 1)
+        .scale_p(2, 3, 0.5, 0.5)
+    )
+    np.testing.assert_allclose(transform.a, expected)
+    np.testing.assert_allclose(
+        transform.rotate(1).a, Transform._rotate(expected, 1)
+    )
+    np.testing.assert_array_equal(b, n_polygon(5))
+
+
+def test_transform_out() -> None:
+    b = n_polygon(7)
+    expected = Transform._translate(Transform._scale(b, 2, 2), 1, 0)
+    out = np.empty_like(b)
+    Transform(b).scale(2, 2).translate(1, 0).apply(out, chunk_size=3)
+    np.testing.assert_allclose(out, expected)
+
+    res = Transform(b, copy=False).scale(2, 2).translate(1, 0).a
+    assert res is b
+    np.testing.assert_allclose(b, expected)
+
+    # Applying in place consumes the pending transformations
+    c = np.array([[1.0], [2.0], [1.0]])
+    transform = Transform(c, copy=False).translate(1, 2)
+    transform.apply(out=c)
+    np.testing.assert_array_equal(transform.a, [[2], [4], [1]])
+    np.testing.assert_array_equal(c, [[2], [4], [1]])
+
+
+def test_transform_results() -> None:
+    x = np.array([[1.0], [2.0], [1.0]])
+    transform = Transform(x)
+    # The input is copied when the transform is built
+    x[0] = 100
+    r1 = transform.translate(1, 0).a
+    np.testing.assert_array_equal(r1, [[2], [2], [1]])
+    # A returned array is not changed by later transformations
+    r2 = transform.scale(2, 2).a
+    assert r2 is not r1
+    np.testing.assert_array_equal(r1, [[2], [2], [1]])
+    np.testing.assert_array_equal(r2, [[4], [4], [1]])
+
+    # Integer inputs can not hold the result in place
+    i = np.array([[1], [2], [1]])
+    np.testing.assert_array_equal(
+        Transform(i, copy=False).translate(1, 0).a, [[2], [2], [1]]
+    )
+    np.testing.assert_array_equal(i, [[1], [2], [1]])
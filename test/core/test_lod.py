@@ -0,0 +1,30 @@
+import numpy as np
+
+from project.core.geometry import Spirograph
+from project.core.lod import LODPyramid
+
+a = Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 40 * np.pi, 10**6))
+
+
+def test_levels_keep_extremes() -> None:
+    pyramid = LODPyramid(a)
+    assert len(pyramid.levels) > 2
+    assert pyramid.spans == sorted(pyramid.spans)
+    for indices in pyramid.levels[1:]:
+        assert np.all(np.diff(indices) > 0)
+        kept = a[:, indices]
+        np.testing.assert_array_equal(kept.min(axis=1), a.min(axis=1))
+        np.testing.assert_array_equal(kept.max(axis=1), a.max(axis=1))
+
+
+def test_points() -> None:
+    pyramid = LODPyramid(a)
+    assert pyramid.select(0.0) == 0
+    assert pyramid.select(np.inf) == len(pyramid.levels) - 1
+    np.testing.assert_array_equal(pyramid.points(1234, 0.0), a[:, :1234])
+
+    pixel_size = 2 / 500
+    points = pyramid.points(50001, pixel_size)
+    assert points.shape[1] < 50001
+    np.testing.assert_array_equal(points[:, 0], a[:, 0])
+    np.testing.assert_array_equal(points[:, -1], a[:, 50000])
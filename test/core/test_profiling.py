@@ -0,0 +1,83 @@
+import tracemalloc
+from typing import Iterator
+
+import numpy as np
+import pytest
+
+from project.core import profiling
+from project.core.epicycle import Epicycle
+from project.core.geometry import Spirograph, Transform
+
+
+@pytest.fixture(autouse=True)
+def clean() -> Iterator[None]:
+    profiling.reset()
+    yield
+    profiling.disable()
+    profiling.reset()
+
+
+def test_disabled() -> None:
+    assert not profiling.enabled()
+    assert profiling.stage("a") is profiling.stage("b")
+    Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 1, 100))
+    assert profiling.stats() == {}
+
+
+def test_stages() -> None:
+    profiling.enable()
+    t = Spirograph.angles(0, 20 * np.pi, 1000)
+    a = Spirograph.trajectory(0.8, 0.3, t, workers=2)
+    Spirograph.trajectory(0.8, 0.3, t, method="recurrence")
+    Transform(a).scale(2, 2).a
+    stats = profiling.stats()
+    # The chunks of the threads are not counted as separate calls
+    assert stats["trajectory"]["calls"] == 2
+    assert stats["trajectory"]["samples"] == 2000
+    assert stats["transform"]["samples"] == 1000
+    assert stats["trajectory"]["time"] >= stats["trajectory"]["last"] > 0
+
+    with profiling.stage("outer", 1):
+        with profiling.stage("outer", 1):
+            pass
+    assert profiling.stats()["outer"]["calls"] == 1
+
+    profiling.merge(stats)
+    assert profiling.stats()["trajectory"]["calls"] == 4
+    assert profiling.summary().splitlines()[1].startswith("trajectory")
+
+
+def test_bezier_stages() -> None:
+    profiling.enable()
+    e = Epicycle()
+    e.add_circles([1, 0.5], [1, -3], [0, 0.2])
+    e.bezier(0, 2 * np.pi, 1e-3)
+    stats = profiling.stats()
+    assert stats["trajectory"]["time"] > 0
+    calls = stats["trajectory"]["calls"]
+    # Both the points and the tangents of the spans are counted
+    Spirograph.bezier(0.8, 0.3, 0, 2 * np.pi, 1e-3)
+    stats = profiling.stats()
+    assert stats["trajectory"]["calls"] >= calls + 2
+
+
+def test_memory() -> None:
+    profiling.enable(memory=True)
+    with profiling.stage("outer"):
+        with profiling.stage("inner"):
+            a = np.ones(2**20)
+        del a
+    stats = profiling.stats()
+    assert stats["inner"]["bytes"] >= 8 * 2**20
+    assert stats["outer"]["bytes"] >= stats["inner"]["bytes"]
+    profiling.disable()
+    assert not tracemalloc.is_tracing()
+
+    # A tracing started by the caller is left running
+    tracemalloc.start()
+    try:
+        profiling.enable(memory=True)
+        profiling.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
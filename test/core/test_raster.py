@@ -0,0 +1,52 @@
+import io
+import struct
+import zlib
+
+import numpy as np
+
+from project.core.geometry import Spirograph
+from project.core.raster import Rasterizer
+
+
+def test_rasterize() -> None:
+    a = Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 20 * np.pi, 5000))
+    coverage = Rasterizer.rasterize(a, 64, 32)
+    assert coverage.shape == (32, 64)
+    assert coverage.min() == 0 and coverage.max() == 1
+    # Anti-aliased edges have partial coverage
+    assert ((coverage > 0) & (coverage < 1)).any()
+    # The curve is centered, the unit circle fits the height
+    assert not coverage[:, :15].any() and not coverage[:, -15:].any()
+
+    # A horizontal line through the middle of the image
+    line = np.array([[-1, 1], [0.01, 0.01], [1, 1]])
+    coverage = Rasterizer.rasterize(line, 16, line_width=1)
+    assert np.allclose(coverage.sum(axis=0), 1)
+
+
+def test_sample_segments() -> None:
+    x = np.array([0.0, 10.0, 10.0, 0.5])
+    y = np.array([0.0, 0.0, 7.0, 7.0])
+    (full,) = map(np.array, Rasterizer._sample_segments(x, y, batch=1000))
+    assert full[0].shape[0] == 20 + 14 + 19 + 1
+    np.testing.assert_allclose(full[:, [0, 20, 34, -1]], [x, y])
+    # Long segments are split across batches of bounded size
+    batches = list(map(np.array, Rasterizer._sample_segments(x, y, batch=7)))
+    assert max(b[0].shape[0] for b in batches) == 7
+    np.testing.assert_array_equal(np.hstack(batches), full)
+
+
+def test_png() -> None:
+    coverage = np.linspace(0, 1, 12).reshape(3, 4)
+    for image in (Rasterizer.grayscale(coverage), Rasterizer.rgba(coverage)):
+        f = io.BytesIO()
+        Rasterizer.write_png(image, f)
+        data = f.getvalue()
+        assert data[:8] == b"\x89PNG\r\n\x1a\n"
+        width, height = struct.unpack(">II", data[16:24])
+        assert (width, height) == (4, 3)
+        size = struct.unpack(">I", data[33:37])[0]
+        raw = np.frombuffer(zlib.decompress(data[41 : 41 + size]), np.uint8)
+        rows = raw.reshape(3, -1)
+        assert not rows[:, 0].any()
+        assert np.array_equal(rows[:, 1:], image.reshape(3, -1))
@@ -0,0 +1,138 @@
+import gzip
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from project.core.geometry import Spirograph, Transform
+from project.core.svg_encoder import SVGDocument, SVGEncoder
+
+a = Spirograph.trajectory(0.8, 0.3, Spirograph.angles(0, 20, 101))
+
+
+def test_encode_path() -> None:
+    svg = SVGEncoder.encode_path(a)
+    arr = 500 * (a + np.array([[1], [1], [0]]))
+    assert svg.startswith(SVGEncoder.header())
+    assert f"\n    M {arr[0, 0]} {arr[1, 0]} \n" in svg
+    assert f"    L {arr[0, -1]} {arr[1, -1]} \n" in svg
+    assert svg.count(" L ") == a.shape[1] - 1
+    assert svg.endswith("</svg>\n")
+
+
+def test_write_path_chunks(tmp_path: Path) -> None:
+    buffer = io.StringIO()
+    SVGEncoder.write_path(a, buffer, chunk_size=7)
+    assert buffer.getvalue() == SVGEncoder.encode_path(a)
+
+    SVGEncoder.write_path(a, tmp_path / "out.svg", chunk_size=10)
+    assert (tmp_path / "out.svg").read_text(
+        encoding="utf-8"
+    ) == SVGEncoder.encode_path(a)
+
+
+def parse_relative(svg: str) -> np.ndarray:
+    data = svg[svg.index('d="') + 3 : svg.index('"', svg.index('d="') + 3)]
+    start, rest = data.split("l")
+    values = np.array([float(v) for v in start.split()[1:] + rest.split()])
+    return np.cumsum(values.reshape(-1, 2), axis=0).T
+
+
+def test_encode_path_compact(tmp_path: Path) -> None:
+    svg = SVGEncoder.encode_path(a, decimals=2)
+    points = parse_relative(svg)
+    arr = 500 * (a[:2] + 1)
+    assert points.shape[1] <= arr.shape[1]
+    np.testing.assert_allclose(points[:, 0], arr[:, 0], atol=0.005)
+    np.testing.assert_allclose(points[:, -1], arr[:, -1], atol=0.005)
+    assert len(svg) < len(SVGEncoder.encode_path(a))
+
+    # Points identical after rounding are dropped
+    b = np.repeat(a, 3, axis=1)
+    assert SVGEncoder.encode_path(b, decimals=2) == svg
+
+    SVGEncoder.write_path(a, tmp_path / "out.svgz", decimals=2, chunk_size=7)
+    with gzip.open(tmp_path / "out.svgz", "rt", encoding="utf-8") as f:
+        assert f.read() == svg
+
+    # A path collapsed to a single point is a lone move command
+    point = SVGEncoder.encode_path(np.repeat(a[:, :1], 3, axis=1), decimals=0)
+    assert '<path d="\n    M 970 500\n    "' in point
+    with pytest.raises(ValueError):
+        SVGEncoder.encode_path(a, decimals=-1)
+
+
+def test_encode_bezier() -> None:
+    b = Spirograph.bezier(0.8, 0.3, 0, 20, 1e-4)
+    spans = (b.shape[1] - 1) // 3
+    svg = SVGEncoder.encode_path(b, bezier=True)
+    arr = 500 * (b[:2] + 1)
+    assert f"\n    M {arr[0, 0]} {arr[1, 0]} \n" in svg
+    assert svg.count(" C ") == spans
+    assert " L " not in svg
+    for chunk_size in (1, 2, 3, 5):
+        buffer = io.StringIO()
+        SVGEncoder.write_path(b, buffer, chunk_size=chunk_size, bezier=True)
+        assert buffer.getvalue() == svg
+
+    # Relative controls and ends are taken from the start of each span
+    compact = SVGEncoder.encode_path(b, decimals=2, bezier=True)
+    data = compact[compact.index('d="') + 3 :].split('"')[0]
+    start, rest = data.split("c")
+    values = np.array([float(v) for v in rest.split()]).reshape(-1, 3, 2)
+    ends = np.cumsum(values[:, 2], axis=0) + [
+        float(v) for v in start.split()[1:]
+    ]
+    np.testing.assert_allclose(ends.T, arr[:, 3::3], atol=0.01)
+    starts = np.vstack([arr[:, :1].T, ends[:-1]])
+    np.testing.assert_allclose(
+        (starts + values[:, 0]).T, arr[:, 1::3], atol=0.01
+    )
+    # Including first chunks holding only the start point
+    for chunk_size in (1, 2, 3, 4):
+        buffer = io.StringIO()
+        SVGEncoder.write_path(
+            b, buffer, chunk_size=chunk_size, decimals=2, bezier=True
+        )
+        assert buffer.getvalue() == compact
+
+    with pytest.raises(ValueError):
+        SVGEncoder.encode_path(b[:, :-1], bezier=True)
+
+
+def test_document() -> None:
+    buffer = io.StringIO()
+    with SVGDocument(buffer, 20, 10, stroke="black") as document:
+        with document.group(
+            Transform(a).translate(100, 200), stroke_width=2
+        ) as group:
+            group.add_path(a, fill="none")
+        document.add_path(Transform(a).scale(2, 3), decimals=1)
+    svg = buffer.getvalue()
+
+    assert svg.startswith(SVGEncoder.header(20, 10) + '  <g stroke="black">')
+    # The padding surrounds the drawing on both sides
+    assert 'width="21.0cm" height="11.0cm"' in svg
+    assert 'viewBox="-50 -50 2100 1100"' in svg
+    assert '    <g transform="matrix(1.0 0.0 0.0 1.0 100.0 200.0)"' in svg
+    assert ' stroke-width="2">\n      <path d="\n    M ' in svg
+    assert svg.count("</g>") == 2
+    assert svg.endswith("  </g>\n</svg>\n")
+    points = parse_relative(svg[svg.rindex("<path") :])
+    np.testing.assert_allclose(points, a[:2] * [[2], [3]], atol=0.05)
+
+
+def test_document_grid() -> None:
+    buffer = io.StringIO()
+    trajectories = (a for _ in range(5))
+    with SVGDocument(
+        buffer, *SVGDocument.grid_size(5, 2, cell=1.5)
+    ) as document:
+        assert document.add_grid(trajectories, 2, cell=1.5) == 5
+    svg = buffer.getvalue()
+    assert svg.startswith(SVGEncoder.header(3, 4.5))
+    assert svg.count("<path") == 5
+    # The last trajectory is centered in the first cell of the third row
+    x, y = a[0, 0] * 75 + 75, a[1, 0] * 75 + 375
+    assert svg.split("<path")[-1].startswith(f' d="\n    M {x} {y} \n')
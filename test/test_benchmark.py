@@ -0,0 +1,35 @@
+from pathlib import Path
+from typing import Any
+
+from benchmark.suite import compare, load, save
+
+
+def results(throughput: float, peak_bytes: int) -> dict[str, Any]:
+    return {
+        "meta": {},
+        "results": {
+            "case": {
+                "samples": 1000,
+                "time": 1000 / throughput,
+                "throughput": throughput,
+                "peak_bytes": peak_bytes,
+            }
+        },
+    }
+
+
+def test_compare(tmp_path: Path) -> None:
+    save(str(tmp_path / "baseline.json"), results(1e6, 1000))
+    save(str(tmp_path / "current.json"), results(0.95e6, 1050))
+    baseline = load(str(tmp_path / "baseline.json"))
+    assert compare(baseline, load(str(tmp_path / "current.json"))) == []
+
+    save(str(tmp_path / "current.json"), results(0.5e6, 2000))
+    regressions = compare(baseline, load(str(tmp_path / "current.json")))
+    assert regressions == [
+        "case: throughput 0.50x of the baseline",
+        "case: peak memory 2.00x of the baseline",
+    ]
+    # Within a looser threshold nothing is flagged
+    current = load(str(tmp_path / "current.json"))
+    assert compare(baseline, current, threshold=1.5) == []
@@ -0,0 +1,112 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from project.cli import load_jobs, parse_job, run
+
+
+def test_parse_job() -> None:
+    job = parse_job(
+        {
+            "type": "epicycle",
+            "radius": "1 0.5",
+            "speed": "1 -3",
+            "angle_i": "0 0",
+            "steps": "10",
+            "output": "a.svg",
+        },
+        "root",
+    )
+    assert job["radius"] == [1.0, 0.5]
+    assert job["steps"] == 10
+    assert job["output"] == os.path.join("root", "a.svg")
+    with pytest.raises(ValueError):
+        parse_job({"type": "spirograph", "l": 0.5, "output": "a.svg"})
+    with pytest.raises(ValueError):
+        parse_job({"l": 0.5, "k": 0.3, "decimals": "-1", "output": "a.svg"})
+
+
+def test_run(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.csv"
+    path.write_text(
+        "type,l,k,steps,output\n"
+        "spirograph,0.8,0.67,100,out/a.svg\n"
+        "spirograph,0.5,0.3,200,out/b.svg\n",
+        encoding="utf-8",
+    )
+    assert [job["steps"] for job in load_jobs(str(path))] == [100, 200]
+    assert run(str(path), workers=1) == 0
+    assert (tmp_path / "out" / "b.svg").read_text().count(" L ") == 199
+
+    # Up to date outputs are not rendered again
+    mtime = os.path.getmtime(tmp_path / "out" / "a.svg")
+    assert run(str(path), workers=1) == 0
+    assert os.path.getmtime(tmp_path / "out" / "a.svg") == mtime
+
+    # Only the edited job is rendered again
+    path.write_text(
+        "type,l,k,steps,output\n"
+        "spirograph,0.8,0.67,100,out/a.svg\n"
+        "spirograph,0.5,0.3,300,out/b.svg\n",
+        encoding="utf-8",
+    )
+    assert run(str(path), workers=1) == 0
+    assert os.path.getmtime(tmp_path / "out" / "a.svg") == mtime
+    assert (tmp_path / "out" / "b.svg").read_text().count(" L ") == 299
+
+    json_path = tmp_path / "jobs.json"
+    json_path.write_text(json.dumps({"jobs": [{"l": 1, "k": 0.2}]}))
+    with pytest.raises(ValueError):
+        load_jobs(str(json_path))
+
+
+def test_run_compact(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.json"
+    path.write_text(
+        json.dumps([{"l": 0.8, "k": 0.3, "decimals": 2, "output": "a.svgz"}]),
+        encoding="utf-8",
+    )
+    assert run(str(path), workers=1) == 0
+    with gzip.open(tmp_path / "a.svgz", "rt", encoding="utf-8") as f:
+        assert "l" in f.read()
+
+
+def test_run_bezier(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.json"
+    path.write_text(
+        json.dumps([{"l": 0.8, "k": 0.3, "bezier": 1e-4, "output": "a.svg"}]),
+        encoding="utf-8",
+    )
+    assert run(str(path), workers=1) == 0
+    svg = (tmp_path / "a.svg").read_text(encoding="utf-8")
+    assert " C " in svg and " L " not in svg
+
+
+def test_run_png(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.json"
+    path.write_text(
+        json.dumps([{"l": 0.8, "k": 0.3, "width": 32, "output": "a.png"}]),
+        encoding="utf-8",
+    )
+    assert run(str(path), workers=1) == 0
+    assert (tmp_path / "a.png").read_bytes()[:4] == b"\x89PNG"
+
+
+def test_run_profile(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "jobs.json"
+    path.write_text(
+        json.dumps([{"l": 0.8, "k": 0.3, "output": "a.svg"}]),
+        encoding="utf-8",
+    )
+    assert run(str(path), workers=1, profile="time") == 0
+    summary = capsys.readouterr().err.splitlines()[-3:]
+    assert summary[0].startswith("stage")
+    assert sorted(line.split()[0] for line in summary[1:]) == [
+        "encode",
+        "trajectory",
+    ]
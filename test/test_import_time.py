@@ -0,0 +1,71 @@
+import json
+import subprocess
+import sys
+
+# Import time budget of the core and command line modules,
+# NumPy excluded, in milliseconds
+BUDGET = 100.0
+MODULES = [
+    "project.core.bezier",
+    "project.core.cache",
+    "project.core.epicycle",
+    "project.core.geometry",
+    "project.core.parallel",
+    "project.core.profiling",
+    "project.core.svg_encoder",
+    "project.cli",
+]
+HEAVY = ["matplotlib", "PySide6", "pyqtgraph"]
+
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_no_heavy_imports() -> None:
+    code = (
+        "import json, sys\n"
+        + "".join(f"import {module}\n" for module in MODULES)
+        + "print(json.dumps(list(sys.modules)))"
+    )
+    modules = json.loads(run_python(code).stdout)
+    for module in modules:
+        assert module.split(".")[0] not in HEAVY, module
+
+
+def test_deferred_thread_pool() -> None:
+    # The thread pool is only loaded when several workers are used
+    code = (
+        "import json, sys\n"
+        + "".join(
+            f"import {module}\n"
+            for module in MODULES
+            if module != "project.core.parallel"
+        )
+        + "print(json.dumps(list(sys.modules)))"
+    )
+    modules = json.loads(run_python(code).stdout)
+    assert "project.core.parallel" not in modules
+    assert "concurrent.futures" not in modules
+
+
+def test_import_time() -> None:
+    # NumPy is imported first so that it is not counted
+    code = "import numpy, numpy.typing\n" + "".join(
+        f"import {module}\n" for module in MODULES
+    )
+    stderr = run_python(code, "-X", "importtime").stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # Only top level imports, their time includes their children
+        if name.startswith(" project"):
+            total += int(cumulative)
+    assert total / 1000 < BUDGET